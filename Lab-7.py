@@ -1,8 +1,15 @@
 import pygame
 import sys
 import time
-from collections import deque
+import math
 import random
+import json
+import platform
+import statistics
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
 
 # Configuration
 WIDTH, HEIGHT = 1000, 600
@@ -68,6 +75,13 @@ def get_polygon_vertices(shape_name, canvas_width, canvas_height):
         return points
     return []
 
+CANVAS_RECT = (0, 0, CANVAS_WIDTH, HEIGHT)
+PANEL_RECT = (CANVAS_WIDTH, 0, PANEL_WIDTH, HEIGHT)
+
+# Fill rules for self-intersecting polygons
+EVEN_ODD = "evenodd"
+NON_ZERO = "nonzero"
+
 PREDEFINED_POLYGONS = {
     'T': 'Triangle',
     'S': 'Square',
@@ -75,249 +89,1266 @@ PREDEFINED_POLYGONS = {
     'H': 'Hexagon'
 }
 
-def generate_noise_background(surface, density=0.01):
-    """Adds subtle random noise to a surface."""
-    w, h = surface.get_size()
-    for _ in range(int(w * h * density)):
-        x = random.randint(0, w - 1)
-        y = random.randint(0, h - 1)
+# Background noise, generated once per (size, density, seed) and reused
+NOISE_DENSITY = 0.005
+NOISE_SEED = 7
+_noise_cache = {}
+
+
+def noise_surface(size, density=0.01, seed=NOISE_SEED):
+    """Cached noise layer: gray dots on a BLACK colorkey, ready to blit."""
+    key = (tuple(size), density, seed)
+    surface = _noise_cache.get(key)
+    if surface is None:
+        w, h = size
+        count = int(w * h * density)
+        rng = np.random.default_rng(seed)
+        xs = rng.integers(0, w, count)
+        ys = rng.integers(0, h, count)
         # Subtle light gray or dark gray dots
-        color = random.choice([LIGHT_GRAY, GRAY])
-        surface.set_at((x, y), color)
+        palette = np.array([LIGHT_GRAY, GRAY], dtype=np.uint8)
+
+        pixels = np.zeros((w, h, 3), dtype=np.uint8)
+        pixels[xs, ys] = palette[rng.integers(0, 2, count)]
+        surface = pygame.surfarray.make_surface(pixels)
+        surface.set_colorkey(BLACK) # Only the dots are drawn when blitted
+        _noise_cache[key] = surface
+    return surface
+
+
+def generate_noise_background(surface, density=0.01, seed=NOISE_SEED):
+    """Adds subtle random noise to a surface."""
+    surface.blit(noise_surface(surface.get_size(), density, seed), (0, 0))
+
+
+def clear_canvas(screen):
+    """Reset the canvas area to black with the cached noise on top."""
+    screen.fill(BLACK, (0, 0, CANVAS_WIDTH, HEIGHT))
+    screen.blit(noise_surface((CANVAS_WIDTH, HEIGHT), NOISE_DENSITY), (0, 0))
+
+
+def build_edge_table(polygon, height=HEIGHT, first_row=0):
+    """Bucket the polygon's non-horizontal edges by their first scanline.
+
+    Each entry is [x, dx_per_row, y_max, winding] where x is the edge's
+    intersection with its first scanline inside rows [first_row, height)
+    and y_max is exclusive (an edge covers min_y <= y < max_y, as in the
+    classic algorithm, so shared vertices are only counted once).
+    """
+    edge_table = {}
+    n = len(polygon)
+    for i in range(n):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % n]
+        if y1 == y2: # Horizontal edges never cross a scanline
+            continue
+
+        winding = 1 if y1 < y2 else -1
+        if y1 > y2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+
+        y_start = max(math.ceil(y1), first_row)
+        y_end = min(math.ceil(y2), height)
+        if y_start >= y_end:
+            continue
+
+        dx = (x2 - x1) / (y2 - y1)
+        x = x1 + (y_start - y1) * dx
+        edge_table.setdefault(y_start, []).append([x, dx, y_end, winding])
+    return edge_table
+
 
+# Absorbs rounding drift from the incremental x updates, so intersections
+# that land exactly on a pixel boundary truncate the same way every row
+X_EPSILON = 1e-7
 
-def visualize_scanline(screen, polygon, fill_color, boundary_color, speed=5):
-    """Visualize Scanline Fill step by step with clear animation"""
+
+def iter_scanline_spans(polygon, width=CANVAS_WIDTH, height=HEIGHT, rule=EVEN_ODD, first_row=0):
+    """Yield the horizontal spans (y, x_start, x_end) covered by a polygon.
+
+    Uses an edge table bucketed by y and an active edge table whose x values
+    are advanced incrementally, so each row only touches the edges that
+    actually cross it. `rule` is EVEN_ODD or NON_ZERO. Spans are inclusive
+    and clipped to a width x height raster, from row `first_row` on. This
+    is the pure algorithm: no drawing, no delays.
+    """
     if len(polygon) < 3:
-        return 0
-    
-    pixels = 0
-    min_y = min(p[1] for p in polygon)
-    max_y = max(p[1] for p in polygon)
-    
-    # Store original state for clearing scanline, if needed, or draw directly
-    
-    for y in range(min_y, max_y + 1):
-        # Draw current scanline in a temporary color (TEAL)
-        pygame.draw.line(screen, TEAL, (0, y), (CANVAS_WIDTH, y), 1)
-        pygame.display.flip()
-        pygame.time.delay(speed * 2) # Slightly longer delay for scanline draw
-
-        intersections = []
-        
-        # Find intersections
-        for i in range(len(polygon)):
-            p1 = polygon[i]
-            p2 = polygon[(i + 1) % len(polygon)]
-            
-            if p1[1] != p2[1]: # Not a horizontal line
-                # Check if scanline crosses the edge
-                if min(p1[1], p2[1]) <= y < max(p1[1], p2[1]):
-                    # Calculate x-coordinate of intersection
-                    x = p1[0] + (y - p1[1]) * (p2[0] - p1[0]) / (p2[1] - p1[1])
-                    intersections.append(int(x))
-        
-        intersections.sort()
-        
-        # Fill between pairs with animation
-        for i in range(0, len(intersections) - 1, 2):
-            for x in range(intersections[i], intersections[i + 1] + 1):
-                if 0 <= x < CANVAS_WIDTH and 0 <= y < HEIGHT:
-                    # Animate pixel by pixel filling
-                    screen.set_at((x, y), fill_color)
-                    pixels += 1
-                    if pixels % 20 == 0: # Update screen every few pixels for smoother animation
-                        pygame.display.flip()
-                        pygame.time.delay(speed // 2)
-
-        # After filling a row, clear the temporary scanline color by redrawing
-        # the background or previous pixel color (too complex). Instead,
-        # we'll just overwrite it with the fill color where applicable.
-        # For professional visualizations, a separate buffer would be used.
-        # Here, the fill color will naturally cover the scanline.
-    
-    return pixels
+        return
 
+    edge_table = build_edge_table(polygon, height, first_row)
+    if not edge_table:
+        return
 
-def visualize_flood_fill_4(screen, x, y, target_color, fill_color, boundary_color, speed=1):
-    """Visualize 4-connected Flood Fill with step-by-step animation"""
-    if x < 0 or x >= CANVAS_WIDTH or y < 0 or y >= HEIGHT:
-        return 0
-    
-    start_pixel_color = screen.get_at((x, y))[:3]
+    active = []
+    y = min(edge_table)
+    last_y = max(edge[2] for bucket in edge_table.values() for edge in bucket)
+
+    while y < last_y:
+        # Move edges starting on this scanline into the active table and
+        # retire the ones that have ended
+        if y in edge_table:
+            active.extend(edge_table[y])
+        active = [edge for edge in active if edge[2] > y]
+        if not active:
+            y += 1
+            continue
+
+        # The AET stays nearly sorted between rows, which timsort handles
+        # in close to linear time
+        active.sort(key=lambda edge: edge[0])
+
+        row_spans = []
+        if rule == NON_ZERO:
+            winding = 0
+            for edge in active:
+                if winding == 0:
+                    start = int(edge[0] + X_EPSILON)
+                winding += edge[3]
+                if winding == 0:
+                    _append_span(row_spans, y, start, int(edge[0] + X_EPSILON), width)
+        else:
+            for i in range(0, len(active) - 1, 2):
+                _append_span(row_spans, y, int(active[i][0] + X_EPSILON),
+                             int(active[i + 1][0] + X_EPSILON), width)
+        yield from row_spans
+
+        for edge in active:
+            edge[0] += edge[1]
+        y += 1
+
+
+def scanline_spans(polygon, width=CANVAS_WIDTH, height=HEIGHT, rule=EVEN_ODD):
+    """List form of iter_scanline_spans."""
+    return list(iter_scanline_spans(polygon, width, height, rule))
+
+
+def _append_span(spans, y, x0, x1, width):
+    # Clip a span to the raster before recording it
+    x0 = max(x0, 0)
+    x1 = min(x1, width - 1)
+    if x0 <= x1:
+        spans.append((y, x0, x1))
+
+
+def run_fill(steps):
+    """Drain a fill step generator headlessly. Returns (pixels, spans)."""
+    spans = list(steps)
+    pixels = sum(x1 - x0 + 1 for _, x0, x1 in spans)
+    return pixels, spans
+
+
+def scanline_fill_steps(raster, polygon, fill_color, rule=EVEN_ODD):
+    """Scanline-fill a polygon into a NumPy raster indexed [x, y].
+
+    `raster` uses the pygame.surfarray layout, so it can be a plain array or
+    a pixels3d()/pixels2d() view of a surface. Whole spans are written with
+    slice assignment, and each span is yielded right after it is written.
+    """
+    width, height = raster.shape[:2]
+    for y, x0, x1 in iter_scanline_spans(polygon, width, height, rule):
+        raster[x0:x1 + 1, y] = fill_color
+        yield (y, x0, x1)
+
+
+def scanline_fill(raster, polygon, fill_color, rule=EVEN_ODD):
+    """Headless scanline fill. Returns (pixels, spans)."""
+    return run_fill(scanline_fill_steps(raster, polygon, fill_color, rule))
+
+
+class FillMask:
+    """Reusable byte-per-pixel [x, y] mask for the fill algorithms.
+
+    The buffers only grow, are viewed at the shape of each fill and are
+    recomputed in place, so repeated fills, or bands of different heights,
+    neither allocate nor hash anything. The span fill clears bits as it
+    fills, so the same mask tracks both "may fill" and "already visited".
+    """
+
+    def __init__(self):
+        self.mask = None
+        self._match = None
+        self._channel = None
+        self._buffers = np.zeros((3, 0), dtype=bool)
+
+    def _ensure(self, shape):
+        if self.mask is None or self.mask.shape != shape:
+            size = shape[0] * shape[1]
+            if self._buffers.shape[1] < size:
+                self._buffers = np.zeros((3, size), dtype=bool)
+            self.mask, self._match, self._channel = (
+                buffer[:size].reshape(shape) for buffer in self._buffers)
+
+    def _color_match(self, raster, color):
+        # Compare channel by channel into preallocated buffers instead of
+        # building a full (W, H, 3) boolean temporary
+        if raster.ndim == 2:
+            return np.equal(raster, color, out=self._match)
+        np.equal(raster[..., 0], color[0], out=self._match)
+        for c in (1, 2):
+            np.equal(raster[..., c], color[c], out=self._channel)
+            self._match &= self._channel
+        return self._match
+
+    def matching(self, raster, color):
+        """Mask of pixels equal to `color`."""
+        self._ensure(raster.shape[:2])
+        self.mask[...] = self._color_match(raster, color)
+        return self.mask
+
+    def excluding(self, raster, *colors):
+        """Mask of pixels equal to none of `colors`."""
+        self._ensure(raster.shape[:2])
+        self.mask.fill(True)
+        for color in colors:
+            match = self._color_match(raster, color)
+            np.logical_not(match, out=match)
+            self.mask &= match
+        return self.mask
+
+
+# Shared across fills so the canvas-sized buffers are reused between runs
+_fill_mask = FillMask()
+
+
+def span_fill_steps(raster, x, y, fillable, fill_color, connectivity=4):
+    """Span-based seed fill (Smith's algorithm) on a NumPy raster.
+
+    `fillable` is a boolean [x, y] mask of pixels the fill may enter (see
+    FillMask); it is cleared as spans are filled, so it doubles as the
+    visited set. Each step
+    grows a whole horizontal run from a seed and scans the rows above and
+    below for runs to push, so the stack holds span seeds, not pixels.
+    Yields each inclusive span (y, x_start, x_end) as it is filled.
+    """
+    width, height = fillable.shape
+    if not fillable[x, y]:
+        return
+
+    reach = 1 if connectivity == 8 else 0
+    stack = [(x, y)]
+
+    while stack:
+        sx, sy = stack.pop()
+        row = fillable[:, sy]
+        if not row[sx]:
+            continue
+
+        # Grow the run left and right of the seed
+        left = row[sx::-1]
+        k = int(np.argmin(left))
+        x0 = 0 if left[k] else sx - k + 1
+        right = row[sx:]
+        k = int(np.argmin(right))
+        x1 = width - 1 if right[k] else sx + k - 1
+
+        row[x0:x1 + 1] = False
+        raster[x0:x1 + 1, sy] = fill_color
+        yield (sy, x0, x1)
+
+        # Push one seed per fillable run on the neighbouring rows; 8-connected
+        # fills also reach one pixel past each end diagonally
+        lo = max(x0 - reach, 0)
+        hi = min(x1 + reach, width - 1)
+        for ny in (sy - 1, sy + 1):
+            if 0 <= ny < height:
+                segment = fillable[lo:hi + 1, ny]
+                starts = np.flatnonzero(segment[1:] & ~segment[:-1]) + 1
+                if segment[0]:
+                    stack.append((lo, ny))
+                stack.extend((lo + int(i), ny) for i in starts)
+
+
+def span_fill(raster, x, y, fillable, fill_color, connectivity=4):
+    """Headless span fill. Returns (pixels, spans)."""
+    return run_fill(span_fill_steps(raster, x, y, fillable, fill_color, connectivity))
+
+
+def flood_fill_steps(raster, x, y, target_color, fill_color, boundary_color, connectivity=4, mask=None):
+    """Flood fill: replace the region of `target_color` connected to (x, y).
+
+    `mask` is the FillMask to work in; the shared one by default.
+    """
+    width, height = raster.shape[:2]
+    if x < 0 or x >= width or y < 0 or y >= height:
+        return
+
+    start_pixel_color = tuple(raster[x, y][:3])
     if start_pixel_color != target_color:
-        return 0
+        return
     if target_color == fill_color or start_pixel_color == fill_color: # Already filled or trying to fill with same color
-        return 0
+        return
     if start_pixel_color == boundary_color: # Don't fill boundary
+        return
+
+    fillable = (_fill_mask if mask is None else mask).matching(raster, target_color)
+    yield from span_fill_steps(raster, x, y, fillable, fill_color, connectivity)
+
+
+def flood_fill(raster, x, y, target_color, fill_color, boundary_color, connectivity=4, mask=None):
+    """Headless flood fill. Returns (pixels, spans)."""
+    return run_fill(flood_fill_steps(raster, x, y, target_color, fill_color, boundary_color, connectivity, mask))
+
+
+def boundary_fill_steps(raster, x, y, boundary_color, fill_color, connectivity=4, mask=None):
+    """Boundary fill: fill outward from (x, y) until `boundary_color` is hit.
+
+    `mask` is the FillMask to work in; the shared one by default.
+    """
+    width, height = raster.shape[:2]
+    if x < 0 or x >= width or y < 0 or y >= height:
+        return
+
+    start_pixel_color = tuple(raster[x, y][:3])
+    if start_pixel_color == boundary_color or start_pixel_color == fill_color:
+        return
+
+    fillable = (_fill_mask if mask is None else mask).excluding(raster, boundary_color, fill_color)
+    yield from span_fill_steps(raster, x, y, fillable, fill_color, connectivity)
+
+
+def boundary_fill(raster, x, y, boundary_color, fill_color, connectivity=4, mask=None):
+    """Headless boundary fill. Returns (pixels, spans)."""
+    return run_fill(boundary_fill_steps(raster, x, y, boundary_color, fill_color, connectivity, mask))
+
+
+# Batch rasterization of many polygons into one raster
+BAND_HEIGHT = 128
+MAP_LAYER_POLYGONS = 2000
+
+
+def build_global_edge_table(polygons, height=HEIGHT):
+    """Vectorized edge table for many polygons, sorted by first scanline.
+
+    Returns a dict of parallel arrays: y_start/y_end (the rows an edge
+    crosses, end exclusive), x (intersection with row y_start), dx (x step
+    per row), winding (+1 downward, -1 upward) and owner (polygon index).
+    """
+    ids = [i for i, polygon in enumerate(polygons) if len(polygon) >= 3]
+    empty = {name: np.zeros(0, dtype=np.int64) for name in ("y_start", "y_end", "winding", "owner")}
+    empty.update(x=np.zeros(0), dx=np.zeros(0))
+    if not ids:
+        return empty
+
+    counts = np.array([len(polygons[i]) for i in ids])
+    points = np.array([vertex for i in ids for vertex in polygons[i]], dtype=float).reshape(-1, 2)
+    owner = np.repeat(ids, counts)
+
+    # Each vertex connects to the next one of the same polygon, wrapping
+    # the last vertex back to the first
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    following = np.arange(len(points)) + 1
+    wraps = following - first == np.repeat(counts, counts)
+    following[wraps] = first[wraps]
+
+    x1, y1 = points[:, 0], points[:, 1]
+    x2, y2 = points[following, 0], points[following, 1]
+    downward = y1 < y2
+    top_x = np.where(downward, x1, x2)
+    top_y = np.where(downward, y1, y2)
+    bottom_x = np.where(downward, x2, x1)
+    bottom_y = np.where(downward, y2, y1)
+
+    y_start = np.maximum(np.ceil(top_y), 0).astype(np.int64)
+    y_end = np.minimum(np.ceil(bottom_y), height).astype(np.int64)
+    keep = (y1 != y2) & (y_start < y_end) # Horizontal edges never cross a scanline
+    if not keep.any():
+        return empty
+
+    dx = (bottom_x[keep] - top_x[keep]) / (bottom_y[keep] - top_y[keep])
+    x = top_x[keep] + (y_start[keep] - top_y[keep]) * dx
+    order = np.argsort(y_start[keep], kind="stable")
+    return {
+        "y_start": y_start[keep][order],
+        "y_end": y_end[keep][order],
+        "x": x[order],
+        "dx": dx[order],
+        "winding": np.where(downward[keep], 1, -1)[order],
+        "owner": owner[keep][order],
+    }
+
+
+def _band_edges(edges, band_start, band_end):
+    # Edges are sorted by y_start, so the candidates are a prefix
+    n = np.searchsorted(edges["y_start"], band_end)
+    sel = np.flatnonzero(edges["y_end"][:n] > band_start)
+    return {name: values[sel] for name, values in edges.items()}
+
+
+def _ranges(starts, lengths):
+    # Concatenated aranges [s, s + n) for every (s, n), without a Python loop
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(lengths.sum()) - offsets + np.repeat(starts, lengths)
+
+
+def batch_fill_band(raster, edges, colors, rule, band_start, band_end):
+    """Scanline-fill rows [band_start, band_end) of every polygon at once.
+
+    All edge/row crossings in the band are generated as arrays, sorted by
+    (row, polygon, x) and paired into spans per the fill rule. Where
+    polygons overlap, the one later in the input list wins. Returns the
+    number of pixels painted.
+    """
+    edges = _band_edges(edges, band_start, band_end)
+    if not len(edges["y_start"]):
         return 0
-    
+
+    r0 = np.maximum(edges["y_start"], band_start)
+    r1 = np.minimum(edges["y_end"], band_end)
+    counts = r1 - r0
+    e = np.repeat(np.arange(len(counts)), counts)
+    ys = _ranges(r0, counts)
+    xs = edges["x"][e] + (ys - edges["y_start"][e]) * edges["dx"][e]
+    owner = edges["owner"][e]
+    winding = edges["winding"][e]
+
+    order = np.lexsort((xs, owner, ys))
+    xs, ys, owner, winding = xs[order], ys[order], owner[order], winding[order]
+
+    # Crossings of one polygon on one row form a group
+    index = np.arange(len(xs))
+    new_group = np.ones(len(xs), dtype=bool)
+    new_group[1:] = (ys[1:] != ys[:-1]) | (owner[1:] != owner[:-1])
+    group_start = np.maximum.accumulate(np.where(new_group, index, 0))
+
+    if rule == NON_ZERO:
+        total = np.cumsum(winding)
+        inside_after = total - (total - winding)[group_start] != 0
+        inside_before = total - winding - (total - winding)[group_start] != 0
+        starts = np.flatnonzero(~inside_before & inside_after)
+        ends = np.flatnonzero(inside_before & ~inside_after)
+    else:
+        same_next = np.zeros(len(xs), dtype=bool)
+        same_next[:-1] = ~new_group[1:]
+        starts = np.flatnonzero(((index - group_start) % 2 == 0) & same_next)
+        ends = starts + 1
+
+    width = raster.shape[0]
+    x0 = np.maximum(np.trunc(xs[starts] + X_EPSILON).astype(np.int64), 0)
+    x1 = np.minimum(np.trunc(xs[ends] + X_EPSILON).astype(np.int64), width - 1)
+    valid = x0 <= x1
+    x0, x1 = x0[valid], x1[valid]
+    span_y, span_owner = ys[starts][valid], owner[starts][valid]
+
+    # Resolve overlaps per pixel with a label buffer: highest polygon wins
+    rows = band_end - band_start
+    lengths = x1 - x0 + 1
+    label = np.full(width * rows, -1, dtype=np.int64)
+    flat = _ranges(x0, lengths) * rows + np.repeat(span_y - band_start, lengths)
+    np.maximum.at(label, flat, np.repeat(span_owner, lengths))
+
+    label = label.reshape(width, rows)
+    covered = label >= 0
+    band = raster[:, band_start:band_end]
+    band[covered] = colors[label[covered]]
+    return int(np.count_nonzero(covered))
+
+
+def _shared_band_worker(job):
+    # Runs in a worker process: attach to the shared arrays and run one band
+    specs, task, args = job
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    try:
+        arrays = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+                  for shm, (_, shape, dtype) in zip(blocks, specs)]
+        result = task(*arrays, *args)
+        del arrays
+    finally:
+        for shm in blocks:
+            shm.close()
+    return result
+
+
+# Worker pools are kept per worker count, so repeated fills skip the spawn
+_band_pools = {}
+# SharedRaster instances by id() of their array, see SharedBands
+_shared_rasters = {}
+
+
+def _band_pool(workers):
+    pool = _band_pools.get(workers)
+    if pool is None:
+        pool = _band_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+
+class SharedRaster:
+    """An array that lives in shared memory across band-parallel fills.
+
+    Fills on `array` hand the workers this buffer directly instead of
+    copying the raster into shared memory and back on every call. Use it
+    as a context manager, or call close() once no views of `array` remain.
+    """
+
+    def __init__(self, shape, dtype=np.uint8):
+        dtype = np.dtype(dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        _shared_rasters[id(self.array)] = self
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def close(self):
+        if self.array is not None:
+            del _shared_rasters[id(self.array)]
+            self.array = None
+            self._shm.close()
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _shared_raster_of(array):
+    owner = _shared_rasters.get(id(array))
+    return owner if owner is not None and owner.array is array else None
+
+
+class SharedBands:
+    """Arrays shared with a pool of worker processes for band-parallel work.
+
+    On entry every array that is not a SharedRaster's is copied into shared
+    memory once, and `scratch` (shape, dtype) arrays are allocated there
+    zeroed; map() then runs task(*views, *args) for each band, every worker
+    writing its own rows in place. On exit the copied arrays are copied
+    back, only the rows passed to mark() if any were. `views` are the
+    arrays followed by the scratch ones, so the parent can read results
+    between passes. With one worker or fewer the tasks run in this process
+    on the arrays themselves.
+    """
+
+    def __init__(self, arrays, workers=None, scratch=()):
+        self.arrays = list(arrays)
+        self.workers = workers
+        self.scratch = list(scratch)
+        self.views = self.arrays
+        self._names = []
+        self._blocks = []
+        self._copied = []
+        self._dirty = None
+        self._pool = None
+
+    def __enter__(self):
+        if not (self.workers and self.workers > 1):
+            self.views = self.arrays + [np.zeros(shape, dtype=dtype) for shape, dtype in self.scratch]
+            return self
+
+        self.views = []
+        for array in self.arrays:
+            owner = _shared_raster_of(array)
+            if owner is not None:
+                self._names.append(owner.name)
+                self.views.append(array)
+                continue
+            view = self._allocate(array.shape, array.dtype)
+            view[...] = array
+            self._copied.append((array, view))
+        for shape, dtype in self.scratch:
+            # Fresh shared memory reads as zeros
+            self._allocate(shape, np.dtype(dtype))
+        self._pool = _band_pool(self.workers)
+        return self
+
+    def _allocate(self, shape, dtype):
+        shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._blocks.append(shm)
+        self._names.append(shm.name)
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        self.views.append(view)
+        return view
+
+    def mark(self, band_start, band_end):
+        """Record rows [band_start, band_end) as written, to be copied back."""
+        if self._dirty is None:
+            self._dirty = []
+        self._dirty.append((band_start, band_end))
+
+    def map(self, task, band_args):
+        """Run task over every band; returns the results in band order."""
+        if self._pool is None:
+            return [task(*self.views, *args) for args in band_args]
+        specs = [(name, view.shape, view.dtype.str) for name, view in zip(self._names, self.views)]
+        return list(self._pool.map(_shared_band_worker, [(specs, task, args) for args in band_args]))
+
+    def __exit__(self, exc_type, exc, tb):
+        self._pool = None
+        if exc_type is None:
+            for array, view in self._copied:
+                if self._dirty is None:
+                    array[...] = view
+                for start, end in self._dirty or ():
+                    array[:, start:end] = view[:, start:end]
+        self.views = self.arrays
+        self._copied = []
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+        self._names = []
+        return False
+
+
+def batch_scanline_fill(raster, polygons, colors, rule=EVEN_ODD, band_height=BAND_HEIGHT, workers=None):
+    """Fill many polygons, each with its own color, in one scanline sweep.
+
+    One global edge table is built for all polygons, then the raster is
+    swept in bands of `band_height` rows. With `workers` > 1 the bands are
+    filled in parallel processes over shared memory. Later polygons paint
+    over earlier ones. Returns the number of pixels painted.
+    """
+    width, height = raster.shape[:2]
+    edges = build_global_edge_table(polygons, height)
+    colors = np.asarray(colors, dtype=raster.dtype)
+    bands = [(start, min(start + band_height, height)) for start in range(0, height, band_height)]
+
+    if workers and workers > 1:
+        band_args = [(_band_edges(edges, start, end), colors, rule, start, end) for start, end in bands]
+        with SharedBands([raster], workers) as shared:
+            painted = shared.map(batch_fill_band, band_args)
+            for (start, end), pixels in zip(bands, painted):
+                if pixels:
+                    shared.mark(start, end)
+            return sum(painted)
+    return sum(batch_fill_band(raster, edges, colors, rule, start, end) for start, end in bands)
+
+
+# Band-parallel fills: every band runs on its own, regions are stitched after
+def band_ranges(height, workers=None, band_height=None):
+    """Split `height` rows into (start, end) bands, one per worker by default."""
+    if band_height is None:
+        band_height = max(-(-height // max(workers or 1, 1)), 1)
+    return [(start, min(start + band_height, height)) for start in range(0, height, band_height)]
+
+
+def _scanline_fill_band(raster, polygon, fill_color, rule, band_start, band_end):
+    # The serial scanline sweep, over this band's rows of the raster only
+    width = raster.shape[0]
     pixels = 0
-    queue = deque([(x, y)])
-    visited = set([(x, y)]) # Use visited set for cleaner fill and avoiding re-adds
-    
-    # Pre-draw the polygon boundary to ensure it's not part of the target color
-    # (This is handled by the `reset_canvas_with_shape` and `main` loop)
-
-    while queue:
-        cx, cy = queue.popleft()
-        
-        # Check current pixel color
-        current_pixel_color = screen.get_at((cx, cy))[:3]
-
-        if current_pixel_color == target_color:
-            # Temporarily highlight the pixel being processed
-            screen.set_at((cx, cy), PURPLE) 
-            pygame.display.flip()
-            pygame.time.delay(speed)
-            
-            # Fill the pixel
-            screen.set_at((cx, cy), fill_color)
-            pixels += 1
-            
-            # Add neighbors if they haven't been visited and are the target color
-            neighbors = [(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)]
-            for nx, ny in neighbors:
-                if 0 <= nx < CANVAS_WIDTH and 0 <= ny < HEIGHT and \
-                   (nx, ny) not in visited and \
-                   screen.get_at((nx, ny))[:3] == target_color:
-                    queue.append((nx, ny))
-                    visited.add((nx, ny)) # Mark as visited when added to queue
+    for y, x0, x1 in iter_scanline_spans(polygon, width, band_end, rule, band_start):
+        raster[x0:x1 + 1, y] = fill_color
+        pixels += x1 - x0 + 1
     return pixels
 
 
-def visualize_flood_fill_8(screen, x, y, target_color, fill_color, boundary_color, speed=1):
-    """Visualize 8-connected Flood Fill"""
-    if x < 0 or x >= CANVAS_WIDTH or y < 0 or y >= HEIGHT:
-        return 0
+def parallel_scanline_fill(raster, polygon, fill_color, rule=EVEN_ODD, workers=None, band_height=None):
+    """Scanline fill with the canvas split into bands over a process pool.
 
-    start_pixel_color = screen.get_at((x, y))[:3]
-    if start_pixel_color != target_color:
+    Scanline bands are independent, so each worker runs the plain sweep
+    over its own rows of the shared raster. Returns the number of pixels
+    painted.
+    """
+    bands = band_ranges(raster.shape[1], workers, band_height)
+    with SharedBands([raster], workers) as shared:
+        painted = shared.map(_scanline_fill_band, [(polygon, fill_color, rule, start, end)
+                                                   for start, end in bands])
+        for (start, end), pixels in zip(bands, painted):
+            if pixels:
+                shared.mark(start, end)
+        return sum(painted)
+
+
+def find_runs(mask):
+    """Horizontal runs of True pixels in an [x, y] mask.
+
+    Returns arrays (ys, x0, x1) of inclusive runs, ordered by row and then
+    by x. Run ends are found along the mask's own memory layout and only
+    the runs themselves are sorted, so the cost is a few passes over the
+    mask plus a sort of the run count.
+    """
+    width, rows = mask.shape
+    cells = mask.view(np.int8)
+    steps = np.empty((width + 1, rows), dtype=np.int8)
+    steps[0] = cells[0]
+    np.subtract(cells[1:], cells[:-1], out=steps[1:-1])
+    np.negative(cells[-1], out=steps[-1])
+    starts = np.flatnonzero(steps == 1)
+    ends = np.flatnonzero(steps == -1)
+    x0, ys = np.divmod(starts, rows)
+    x1 = ends // rows - 1
+    # Runs alternate start/end along each row, so sorting both by position
+    # keeps them paired
+    order = np.argsort(ys * width + x0, kind="stable")
+    end_order = np.argsort((ends % rows) * width + x1, kind="stable")
+    return ys[order], x0[order], x1[end_order]
+
+
+def _label_fill_band(raster, target_color, stop_colors, connectivity, band_start, band_end):
+    """Label the fillable runs of one band.
+
+    Returns (ys, x0, x1, run_labels) with ys relative to the band. Labels
+    are offset by the band's first pixel, so they are unique across bands.
+    """
+    band = raster[:, band_start:band_end]
+    if target_color is not None:
+        fillable = _fill_mask.matching(band, target_color)
+    else:
+        fillable = _fill_mask.excluding(band, *stop_colors)
+    ys, x0, x1 = find_runs(fillable)
+    run_labels, _ = _link_runs(ys, x0, x1, raster.shape[0], connectivity)
+    return ys, x0, x1, run_labels + band_start * raster.shape[0]
+
+
+def _stitch_band_borders(borders, connectivity):
+    # Union-find over the labels of runs that touch across band boundaries
+    reach = 1 if connectivity == 8 else 0
+    parent = {}
+    for (_, (bx0, bx1, below)), ((tx0, tx1, above), _) in zip(borders, borders[1:]):
+        lower, upper = _run_overlaps(bx0, bx1, tx0, tx1, reach)
+        for a, b in zip(above[lower].tolist(), below[upper].tolist()):
+            parent.setdefault(a, a)
+            parent.setdefault(b, b)
+            _uf_union(parent, a, b)
+    return parent
+
+
+def _paint_runs_band(raster, ys, x0, x1, fill_color, band_start, band_end):
+    # The serial span writes, for the runs of the seed's region in this band
+    band = raster[:, band_start:band_end]
+    for y, start, end in zip(ys.tolist(), x0.tolist(), x1.tolist()):
+        band[start:end + 1, y] = fill_color
+    return int((x1 - x0 + 1).sum())
+
+
+def _parallel_region_fill(raster, x, y, fill_color, target_color, stop_colors, connectivity, workers, band_height):
+    bands = band_ranges(raster.shape[1], workers, band_height)
+
+    with SharedBands([raster], workers) as shared:
+        # Every band labels its own runs in one parallel pass
+        runs = shared.map(_label_fill_band, [(target_color, stop_colors, connectivity, start, end)
+                                             for start, end in bands])
+        seed_band = next(i for i, (_, end) in enumerate(bands) if y < end)
+        ys, x0, x1, run_labels = runs[seed_band]
+        hit = np.flatnonzero((ys == y - bands[seed_band][0]) & (x0 <= x) & (x <= x1))
+        if not len(hit):
+            return 0
+        seed = int(run_labels[hit[0]])
+
+        # Regions crossing a band boundary carry one label per band; gather
+        # every label that the stitching merged with the seed's
+        borders = [((x0[ys == 0], x1[ys == 0], labels[ys == 0]),
+                    (x0[ys == end - start - 1], x1[ys == end - start - 1], labels[ys == end - start - 1]))
+                   for (ys, x0, x1, labels), (start, end) in zip(runs, bands)]
+        parent = _stitch_band_borders(borders, connectivity)
+        selected = [seed]
+        if seed in parent:
+            root = _uf_find(parent, seed)
+            selected = [label for label in parent if _uf_find(parent, label) == root]
+        selected = np.array(selected)
+
+        # Then every band holding part of the region paints its runs
+        jobs = []
+        for (ys, x0, x1, labels), band in zip(runs, bands):
+            mine = np.isin(labels, selected)
+            if mine.any():
+                shared.mark(*band)
+                jobs.append((ys[mine], x0[mine], x1[mine], fill_color) + band)
+        return sum(shared.map(_paint_runs_band, jobs))
+
+
+def parallel_flood_fill(raster, x, y, target_color, fill_color, boundary_color, connectivity=4,
+                        workers=None, band_height=None):
+    """Flood fill split into bands over a process pool.
+
+    Every band labels its own regions of `target_color` in one parallel
+    pass, regions that cross band boundaries are merged by a union-find
+    over their border runs, and the bands holding the seed's region then
+    paint it in parallel. Returns the number of pixels painted.
+    """
+    width, height = raster.shape[:2]
+    if x < 0 or x >= width or y < 0 or y >= height:
         return 0
-    if target_color == fill_color or start_pixel_color == fill_color:
+    start_pixel_color = tuple(raster[x, y][:3])
+    if start_pixel_color != target_color or target_color in (fill_color, boundary_color):
+        return 0
+    return _parallel_region_fill(raster, x, y, fill_color, target_color, (), connectivity, workers, band_height)
+
+
+def parallel_boundary_fill(raster, x, y, boundary_color, fill_color, connectivity=4,
+                           workers=None, band_height=None):
+    """Boundary fill split into bands over a process pool. Returns the pixels painted."""
+    width, height = raster.shape[:2]
+    if x < 0 or x >= width or y < 0 or y >= height:
         return 0
-    if start_pixel_color == boundary_color:
+    if tuple(raster[x, y][:3]) in (boundary_color, fill_color):
         return 0
+    return _parallel_region_fill(raster, x, y, fill_color, None, (boundary_color, fill_color),
+                                 connectivity, workers, band_height)
 
-    pixels = 0
-    queue = deque([(x, y)])
-    visited = set([(x, y)])
-    
-    while queue:
-        cx, cy = queue.popleft()
 
-        current_pixel_color = screen.get_at((cx, cy))[:3]
+# Connected-component labeling: label every region once, then fill by lookup
+def pack_colors(raster):
+    """One int32 key per pixel (0xRRGGBB) for an [x, y] RGB raster."""
+    rgb = raster[..., :3].astype(np.int32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
 
-        if current_pixel_color == target_color:
-            screen.set_at((cx, cy), PURPLE)
-            pygame.display.flip()
-            pygame.time.delay(speed)
-            
-            screen.set_at((cx, cy), fill_color)
-            pixels += 1
-            
-            # 8 neighbors
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    if dx != 0 or dy != 0:
-                        nx, ny = cx + dx, cy + dy
-                        if 0 <= nx < CANVAS_WIDTH and 0 <= ny < HEIGHT and \
-                           (nx, ny) not in visited and \
-                           screen.get_at((nx, ny))[:3] == target_color:
-                            queue.append((nx, ny))
-                            visited.add((nx, ny))
-    return pixels
 
+def find_key_runs(keys):
+    """Horizontal runs of equal keys in an [x, y] key image.
 
-def visualize_boundary_fill(screen, x, y, boundary_color, fill_color, speed=1):
-    """Visualize Boundary Fill with step-by-step animation"""
-    if x < 0 or x >= CANVAS_WIDTH or y < 0 or y >= HEIGHT:
-        return 0
-    
-    start_pixel_color = screen.get_at((x, y))[:3]
-    if start_pixel_color == boundary_color or start_pixel_color == fill_color:
+    Returns arrays (ys, x0, x1, run_keys) of inclusive runs covering every
+    pixel, ordered by row and then by x.
+    """
+    width, rows = keys.shape
+    rows_first = keys.T
+    breaks = np.ones((rows, width + 1), dtype=bool)
+    np.not_equal(rows_first[:, 1:], rows_first[:, :-1], out=breaks[:, 1:-1])
+    ys, x0 = np.nonzero(breaks[:, :-1])
+    _, x1 = np.nonzero(breaks[:, 1:])
+    return ys, x0, x1, rows_first[ys, x0]
+
+
+def _run_overlaps(starts, ends, query_starts, query_ends, reach):
+    # Index pairs (query, candidate) of runs that touch. Candidates must be
+    # sorted and disjoint; reach 1 also links runs that touch diagonally
+    first = np.searchsorted(ends, query_starts - reach, side="left")
+    last = np.searchsorted(starts, query_ends + reach, side="right")
+    counts = np.maximum(last - first, 0)
+    return np.repeat(np.arange(len(query_starts)), counts), _ranges(first, counts)
+
+
+def _uf_find(parent, i):
+    # Union-find root lookup with path halving
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _uf_union(parent, a, b):
+    ra, rb = _uf_find(parent, a), _uf_find(parent, b)
+    if ra != rb:
+        parent[max(ra, rb)] = min(ra, rb)
+
+
+def _link_runs(ys, x0, x1, width, connectivity, run_keys=None):
+    # Union runs with the runs they touch on the row above; with run_keys
+    # only runs of the same key are linked. Returns (run_labels, count)
+    if not len(ys):
+        return np.zeros(0, dtype=np.int64), 0
+
+    # Fold the row into the key so all rows are matched in one search;
+    # the two spare columns keep neighbouring rows' keys apart
+    stride = width + 2
+    starts = ys * stride + x0
+    ends = ys * stride + x1
+    reach = 1 if connectivity == 8 else 0
+    lower, upper = _run_overlaps(starts, ends, starts - stride, ends - stride, reach)
+    if run_keys is not None:
+        same = run_keys[lower] == run_keys[upper]
+        lower, upper = lower[same], upper[same]
+
+    parent = list(range(len(ys)))
+    for a, b in zip(lower.tolist(), upper.tolist()):
+        _uf_union(parent, a, b)
+    roots = [_uf_find(parent, i) for i in range(len(parent))]
+    _, run_labels = np.unique(roots, return_inverse=True)
+    return run_labels, int(run_labels.max()) + 1
+
+
+class RegionLabels:
+    """Connected regions of equal color on a canvas, labelled in one pass.
+
+    Every pixel gets the label of its region in `labels` ([x, y], like the
+    raster). Region color, area and whether the region touches the canvas
+    edge are kept per label, and each region's pixels are grouped together,
+    so lookups are O(1) and a fill only touches the pixels it paints. The
+    labels describe the raster as it was when labelled; label again after
+    drawing on it.
+    """
+
+    def __init__(self, raster, connectivity=4):
+        width, height = raster.shape[:2]
+        self.shape = (width, height)
+        self.connectivity = connectivity
+
+        ys, x0, x1, run_keys = find_key_runs(pack_colors(raster))
+        run_labels, self.count = _link_runs(ys, x0, x1, width, connectivity, run_keys)
+        lengths = x1 - x0 + 1
+        self.labels = np.empty((width, height), dtype=np.int32)
+        self.labels[_ranges(x0, lengths), np.repeat(ys, lengths)] = np.repeat(run_labels, lengths)
+
+        self.keys = np.zeros(self.count, dtype=np.int32)
+        self.keys[run_labels] = run_keys
+        self.areas = np.bincount(run_labels, weights=lengths, minlength=self.count).astype(np.int64)
+        self.touches_edge = np.zeros(self.count, dtype=bool)
+        edge_runs = (ys == 0) | (ys == height - 1) | (x0 == 0) | (x1 == width - 1)
+        self.touches_edge[run_labels[edge_runs]] = True
+        self._order = None
+        self._offsets = None
+
+    def label_at(self, x, y):
+        """Label of the region containing (x, y)."""
+        return int(self.labels[x, y])
+
+    def color(self, label):
+        """RGB color of a region."""
+        key = int(self.keys[label])
+        return (key >> 16, (key >> 8) & 0xFF, key & 0xFF)
+
+    def area_at(self, x, y):
+        """Number of pixels in the region containing (x, y)."""
+        return int(self.areas[self.labels[x, y]])
+
+    def enclosed(self, color=None):
+        """Labels of the regions that do not touch the canvas edge, optionally of one color."""
+        selected = ~self.touches_edge
+        if color is not None:
+            selected &= self.keys == ((color[0] << 16) | (color[1] << 8) | color[2])
+        return np.flatnonzero(selected)
+
+    def pixels(self, label):
+        """Flat [x, y] indices of the pixels in a region."""
+        if self._order is None:
+            # Group pixels by label once; every region is then a slice
+            self._order = np.argsort(self.labels, axis=None, kind="stable")
+            self._offsets = np.concatenate(([0], np.cumsum(self.areas)))
+        return self._order[self._offsets[label]:self._offsets[label + 1]]
+
+    def fill_labels(self, raster, labels, fill_color):
+        """Paint every region in `labels`. Returns the number of pixels painted."""
+        labels = np.unique(np.asarray(labels, dtype=np.int64))
+        if not len(labels):
+            return 0
+        area = int(self.areas[labels].sum())
+        if area * 8 > self.labels.size:
+            # Covering much of the canvas: a mask beats gathering pixel lists
+            selected = np.isin(self.labels, labels)
+            raster[selected] = fill_color
+            return area
+        flat = np.concatenate([self.pixels(label) for label in labels])
+        xs, ys = np.unravel_index(flat, self.shape)
+        raster[xs, ys] = fill_color
+        return len(flat)
+
+    def fill_seeds(self, raster, seeds, fill_color):
+        """Paint the regions containing each (x, y) seed. Returns the pixels painted."""
+        if not len(seeds):
+            return 0
+        xs, ys = np.asarray(seeds).T
+        return self.fill_labels(raster, self.labels[xs, ys], fill_color)
+
+    def fill_enclosed(self, raster, fill_color, color=BLACK):
+        """Paint every region of `color` that is closed off from the canvas edge."""
+        return self.fill_labels(raster, self.enclosed(color), fill_color)
+
+
+# Anti-aliased fill from exact per-pixel coverage
+def coverage_mask(polygon, width=CANVAS_WIDTH, height=HEIGHT, rule=NON_ZERO):
+    """Exact area coverage of every pixel by a polygon, in one pass.
+
+    Signed-area accumulation as used by font rasterizers: each edge deposits,
+    into the cells it crosses on every row, the signed area it adds to
+    everything on its right; a prefix sum along each row then turns those
+    deltas into coverage. Returns (x0, y0, alpha) where alpha is an [x, y]
+    float array in 0..1 for the clipped bounding box at (x0, y0), or None if
+    the polygon is entirely off the raster.
+    """
+    if len(polygon) < 3:
+        return None
+    points = np.asarray(polygon, dtype=float).reshape(-1, 2)
+    bx0 = max(int(np.floor(points[:, 0].min())), 0)
+    by0 = max(int(np.floor(points[:, 1].min())), 0)
+    bx1 = min(int(np.ceil(points[:, 0].max())) + 1, width)
+    by1 = min(int(np.ceil(points[:, 1].max())) + 1, height)
+    if bx0 >= bx1 or by0 >= by1:
+        return None
+    cols, rows = bx1 - bx0, by1 - by0
+
+    # Edges in box coordinates, split where they leave the box sideways; the
+    # part past either side is moved onto that side as a vertical segment,
+    # which keeps the signed area it adds to every cell on its right
+    x1, y1 = points[:, 0] - bx0, points[:, 1] - by0
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cuts = (np.array([0.0, cols])[:, None] - x1) / (x2 - x1)
+    cuts = np.sort(np.clip(np.nan_to_num(cuts, nan=0.0), 0, 1), axis=0)
+    t = np.concatenate([np.zeros((1, len(x1))), cuts, np.ones((1, len(x1)))])
+    px = np.clip(x1 + t * (x2 - x1), 0, cols)
+    py = y1 + t * (y2 - y1)
+    x1, y1 = px[:-1].ravel(), py[:-1].ravel()
+    x2, y2 = px[1:].ravel(), py[1:].ravel()
+    keep = y1 != y2
+    x1, y1, x2, y2 = x1[keep], y1[keep], x2[keep], y2[keep]
+    direction = np.where(y1 < y2, 1.0, -1.0)
+    top_x, top_y = np.where(y1 < y2, x1, x2), np.minimum(y1, y2)
+    bottom_y = np.maximum(y1, y2)
+    dxdy = (np.where(y1 < y2, x2, x1) - top_x) / (bottom_y - top_y)
+
+    # Expand to one record per (edge, row) the edge crosses
+    r0 = np.clip(np.floor(top_y), 0, rows).astype(np.int64)
+    r1 = np.clip(np.ceil(bottom_y), 0, rows).astype(np.int64)
+    counts = np.maximum(r1 - r0, 0)
+    e = np.repeat(np.arange(len(counts)), counts)
+    ys = _ranges(r0, counts)
+
+    y_in = np.maximum(ys, top_y[e])
+    y_out = np.minimum(ys + 1, bottom_y[e])
+    d = (y_out - y_in) * direction[e]
+    # Clamped only against rounding: edges were already split at the sides
+    xa = np.clip(top_x[e] + (y_in - top_y[e]) * dxdy[e], 0, cols)
+    xb = np.clip(top_x[e] + (y_out - top_y[e]) * dxdy[e], 0, cols)
+    lo, hi = np.minimum(xa, xb), np.maximum(xa, xb)
+    lo_floor = np.floor(lo)
+    lo_i = lo_floor.astype(np.int64)
+    hi_ceil = np.ceil(hi)
+    hi_i = hi_ceil.astype(np.int64)
+
+    acc = np.zeros((rows, cols + 2))
+    flat = acc.reshape(-1)
+    line = ys * (cols + 2)
+
+    # Edge stays within one cell on this row: split by its mean x
+    narrow = hi_i <= lo_i + 1
+    mid = 0.5 * (xa[narrow] + xb[narrow]) - lo_floor[narrow]
+    base = line[narrow] + lo_i[narrow]
+    np.add.at(flat, base, d[narrow] * (1 - mid))
+    np.add.at(flat, base + 1, d[narrow] * mid)
+
+    # Edge crosses several cells: triangle at each end, constant slope between
+    w = ~narrow
+    d_w, lo_w, hi_w, base = d[w], lo_i[w], hi_i[w], line[w]
+    s = 1 / (hi[w] - lo[w])
+    lo_frac = lo[w] - lo_floor[w]
+    a0 = 0.5 * s * (1 - lo_frac) ** 2
+    hi_frac = hi[w] - hi_ceil[w] + 1
+    am = 0.5 * s * hi_frac ** 2
+    np.add.at(flat, base + lo_w, d_w * a0)
+    np.add.at(flat, base + hi_w, d_w * am)
+
+    two = hi_w == lo_w + 2
+    np.add.at(flat, base[two] + lo_w[two] + 1, d_w[two] * (1 - a0[two] - am[two]))
+
+    many = ~two
+    a1 = s[many] * (1.5 - lo_frac[many])
+    a2 = a1 + (hi_w[many] - lo_w[many] - 3) * s[many]
+    np.add.at(flat, base[many] + lo_w[many] + 1, d_w[many] * (a1 - a0[many]))
+    np.add.at(flat, base[many] + hi_w[many] - 1, d_w[many] * (1 - a2 - am[many]))
+    run = np.maximum(hi_w[many] - lo_w[many] - 3, 0)
+    np.add.at(flat, np.repeat(base[many], run) + _ranges(lo_w[many] + 2, run),
+              np.repeat(d_w[many] * s[many], run))
+
+    area = np.cumsum(acc[:, :cols], axis=1)
+    if rule == EVEN_ODD:
+        folded = np.abs(area) % 2
+        alpha = np.where(folded > 1, 2 - folded, folded)
+    else:
+        alpha = np.minimum(np.abs(area), 1)
+    return bx0, by0, alpha.T
+
+
+def antialiased_fill(raster, polygon, fill_color, rule=NON_ZERO):
+    """Fill a polygon with anti-aliased edges by alpha-blending its coverage.
+
+    Returns the number of pixels with any coverage.
+    """
+    width, height = raster.shape[:2]
+    coverage = coverage_mask(polygon, width, height, rule)
+    if coverage is None:
         return 0
-    
-    pixels = 0
-    stack = [(x, y)]
-    visited = set([(x, y)])
+    x0, y0, alpha = coverage
 
-    while stack:
-        cx, cy = stack.pop()
-        
-        # Check current pixel color
-        current_pixel_color = screen.get_at((cx, cy))[:3]
-        
-        if current_pixel_color == boundary_color or current_pixel_color == fill_color:
-            continue
-        
-        # Highlight current pixel being processed
-        screen.set_at((cx, cy), PURPLE)
-        pygame.display.flip()
-        pygame.time.delay(speed)
-
-        screen.set_at((cx, cy), fill_color)
-        pixels += 1
-        
-        # Add neighbors
-        neighbors = [(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)]
-        for nx, ny in neighbors:
-            if 0 <= nx < CANVAS_WIDTH and 0 <= ny < HEIGHT and \
-               (nx, ny) not in visited: # Only check boundary/fill color on pop
-                stack.append((nx, ny))
-                visited.add((nx, ny)) # Mark as visited when added to stack
-    return pixels
+    region = raster[x0:x0 + alpha.shape[0], y0:y0 + alpha.shape[1]]
+    a = alpha[..., None] if region.ndim == 3 else alpha
+    blended = region * (1 - a) + np.asarray(fill_color, dtype=float) * a
+    region[...] = np.rint(blended).astype(raster.dtype)
+    return int(np.count_nonzero(alpha))
+
+
+class FillAnimator:
+    """Plays a fill step generator on screen, one presented frame at a time.
+
+    Each frame consumes as many steps as fit in `frame_budget` seconds, or
+    about `pixels_per_frame` pixels when that is set, copies the touched
+    area from the raster to the screen and updates only that rectangle.
+    Window events are pumped every frame, so the app stays responsive.
+    """
+
+    def __init__(self, screen, clock, pixels_per_frame=1000, frame_budget=0.008, fps=60):
+        self.screen = screen
+        self.clock = clock
+        self.pixels_per_frame = pixels_per_frame
+        self.frame_budget = frame_budget
+        self.fps = fps
+
+    MAX_PIXELS_PER_FRAME = 128000
+
+    def faster(self):
+        if self.pixels_per_frame is None:
+            return
+        self.pixels_per_frame *= 2
+        if self.pixels_per_frame > self.MAX_PIXELS_PER_FRAME:
+            self.pixels_per_frame = None # Switch to time-budget mode
+
+    def slower(self):
+        if self.pixels_per_frame is None:
+            self.pixels_per_frame = self.MAX_PIXELS_PER_FRAME * 2
+        self.pixels_per_frame = max(self.pixels_per_frame // 2, 10)
+
+    def speed_label(self):
+        if self.pixels_per_frame is None:
+            return f"Max ({self.frame_budget * 1000:.0f} ms/frame)"
+        return f"{self.pixels_per_frame:,} px/frame"
+
+    def run(self, steps, raster):
+        """Animate `steps` (which write into `raster`) to completion.
+
+        Returns (pixels, seconds) where seconds counts only the time spent
+        inside the algorithm, not presenting or waiting for the next frame.
+        SPACE or ESC skips to the end of the animation.
+        """
+        pixels = 0
+        algorithm_time = 0.0
+        finished = False
+        skip = False
+
+        while not finished:
+            frame_start = time.perf_counter()
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.event.post(event) # Let the main loop handle it
+                    skip = True
+                elif event.type == pygame.KEYDOWN:
+                    if event.key in (pygame.K_SPACE, pygame.K_ESCAPE):
+                        skip = True
+                    elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        self.faster()
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.slower()
+
+            frame_spans = []
+            frame_pixels = 0
+            while True:
+                step_start = time.perf_counter()
+                span = next(steps, None)
+                algorithm_time += time.perf_counter() - step_start
+                if span is None:
+                    finished = True
+                    break
+
+                frame_spans.append(span)
+                frame_pixels += span[2] - span[1] + 1
+                if skip:
+                    continue
+                if self.pixels_per_frame:
+                    if frame_pixels >= self.pixels_per_frame:
+                        break
+                elif time.perf_counter() - frame_start >= self.frame_budget:
+                    break
+
+            pixels += frame_pixels
+            self.present(frame_spans, raster)
+            if not finished:
+                self.clock.tick(self.fps)
+
+        return pixels, algorithm_time
+
+    def present(self, spans, raster):
+        """Copy the spans' bounding box from the raster and update only it."""
+        if not spans:
+            return
+        y0 = min(span[0] for span in spans)
+        y1 = max(span[0] for span in spans)
+        x0 = min(span[1] for span in spans)
+        x1 = max(span[2] for span in spans)
+
+        view = pygame.surfarray.pixels3d(self.screen)
+        view[x0:x1 + 1, y0:y1 + 1] = raster[x0:x1 + 1, y0:y1 + 1]
+        del view # Unlock the screen before presenting
+
+        pygame.display.update(pygame.Rect(x0, y0, x1 - x0 + 1, y1 - y0 + 1))
 
 
 def draw_polygon(screen, vertices, color, width=2):
-    """Draw polygon outline"""
+    """Draw polygon outline and return the rectangle it touched"""
     if len(vertices) < 2:
-        return
-    pygame.draw.polygon(screen, color, vertices, width) # Use pygame.draw.polygon for clean outline
+        return None
+    return pygame.draw.polygon(screen, color, vertices, width) # Use pygame.draw.polygon for clean outline
+
+
+_seed_cache = {}
+
+
+def find_interior_seeds(polygon, width=CANVAS_WIDTH, height=HEIGHT, rule=EVEN_ODD):
+    """Interior seed points for a polygon, one per disjoint filled region.
+
+    Spans from the scanline engine are linked into 4-connected regions
+    wherever they overlap on adjacent rows. Each region's seed is the midpoint of the span
+    that is farthest from the region's edges (its half-width, capped by the
+    distance to the region's top and bottom rows), so it never lands on or
+    outside the outline. Seeds are ordered by region area, largest first,
+    and cached per polygon.
+    """
+    key = (tuple(tuple(v) for v in polygon), width, height, rule)
+    if key in _seed_cache:
+        return list(_seed_cache[key])
+
+    spans = scanline_spans(polygon, width, height, rule)
+    parent = list(range(len(spans)))
+
+    # Spans arrive row by row, sorted by x within a row, so overlapping
+    # spans on consecutive rows can be matched with two pointers
+    prev_start = prev_end = 0
+    i = 0
+    while i < len(spans):
+        y = spans[i][0]
+        j = i
+        while j < len(spans) and spans[j][0] == y:
+            j += 1
+        if prev_end > prev_start and spans[prev_start][0] == y - 1:
+            a, b = prev_start, i
+            while a < prev_end and b < j:
+                if spans[a][1] <= spans[b][2] and spans[b][1] <= spans[a][2]:
+                    _uf_union(parent, a, b)
+                if spans[a][2] < spans[b][2]:
+                    a += 1
+                else:
+                    b += 1
+        prev_start, prev_end = i, j
+        i = j
+
+    roots = [_uf_find(parent, k) for k in range(len(spans))]
+    extents = {}
+    for root, (y, x0, x1) in zip(roots, spans):
+        area, top, bottom = extents.get(root, (0, y, y))
+        extents[root] = (area + x1 - x0 + 1, min(top, y), max(bottom, y))
+
+    best = {}
+    for root, (y, x0, x1) in zip(roots, spans):
+        _, top, bottom = extents[root]
+        depth = min((x1 - x0) // 2, y - top, bottom - y)
+        if root not in best or depth > best[root][0]:
+            best[root] = (depth, (x0 + x1) // 2, y)
+
+    # Slivers only one pixel deep (rounding fragments at spike tips, doubled
+    # edges) have no point off the outline, so they only count as a fallback
+    ordered = sorted(best, key=lambda root: -extents[root][0])
+    seeds = [best[root][1:] for root in ordered if best[root][0] > 0] or \
+            [best[root][1:] for root in ordered[:1]]
+    _seed_cache[key] = seeds
+    return list(seeds)
 
 
 def get_center(vertices):
-    """Get center point of polygon (approximate for flood fill seed)"""
+    """Get an interior seed point of the polygon for flood/boundary fill"""
     if not vertices:
         return None
-    min_x = min(v[0] for v in vertices)
-    max_x = max(v[0] for v in vertices)
-    min_y = min(v[1] for v in vertices)
-    max_y = max(v[1] for v in vertices)
-    
-    # Try to find a point guaranteed to be inside for convex polygons
-    # For complex polygons, this might still be outside. For robustness,
-    # we could use a ray casting approach to find an interior point.
-    # For now, simply average the vertices.
-    cx = sum(v[0] for v in vertices) // len(vertices)
-    cy = sum(v[1] for v in vertices) // len(vertices)
-
-    # Basic check: move slightly if it falls on a boundary for flood fill
-    # (This is a simplified approach, a proper point-in-polygon test is better)
-    if pygame.Surface.get_at(pygame.display.get_surface(), (cx, cy))[:3] == BLACK:
-        # Check surrounding pixels if the center happens to be exactly on the boundary
-        for dx in range(-2, 3):
-            for dy in range(-2, 3):
-                test_x, test_y = cx + dx, cy + dy
-                if 0 <= test_x < CANVAS_WIDTH and 0 <= test_y < HEIGHT and \
-                   pygame.Surface.get_at(pygame.display.get_surface(), (test_x, test_y))[:3] == BLACK:
-                    return (test_x, test_y)
-
-    return (cx, cy)
+    seeds = find_interior_seeds(vertices)
+    return seeds[0] if seeds else None
 
 
 def reset_canvas_with_shape(screen, current_polygon_vertices, border_color=WHITE):
     """Clears canvas, adds noise, and draws the selected polygon."""
-    canvas_rect = pygame.Rect(0, 0, CANVAS_WIDTH, HEIGHT)
-    canvas_surface = pygame.Surface(canvas_rect.size)
-    canvas_surface.fill(BLACK)
-    generate_noise_background(canvas_surface, density=0.005) # Add subtle noise
-    screen.blit(canvas_surface, (0, 0)) # Blit to main screen
+    clear_canvas(screen) # Cached noise, a fill and a blit
     
     draw_polygon(screen, current_polygon_vertices, border_color)
-    pygame.display.flip()
 
-def draw_panel(screen, font, vertices, mode, result, current_shape_name):
+def draw_panel(screen, font, vertices, mode, result, current_shape_name, speed_label=None):
     """Draw control panel"""
     panel_x = CANVAS_WIDTH
     pygame.draw.rect(screen, GRAY, (panel_x, 0, PANEL_WIDTH, HEIGHT))
@@ -343,13 +1374,18 @@ def draw_panel(screen, font, vertices, mode, result, current_shape_name):
         "2 - Flood Fill 4-conn (Blue)",
         "3 - Flood Fill 8-conn (Magenta)",
         "4 - Boundary Fill (Orange, Red Border)",
+        "5 - Anti-aliased Fill (Green)",
+        "6 - Fill All Enclosed (Cyan, Labels)",
         "",
+        "M - Map Layer (Batch Fill)",
         "C - Clear Canvas",
-        # "SPACE - Pause/Resume (if applicable)",
+        "+/- - Animation Speed, SPACE - Skip",
         "",
         f"Vertices: {len(vertices)}",
         f"Status: {mode}"
     ]
+    if speed_label:
+        shape_instr.append(f"Speed: {speed_label}")
     
     for line in shape_instr:
         text = font.render(line, True, WHITE)
@@ -371,12 +1407,180 @@ def draw_panel(screen, font, vertices, mode, result, current_shape_name):
             screen.blit(font.render(f"Avg. {speed_per_pixel:.2f} µs/px", True, WHITE), (panel_x + 10, y))
 
 
+class Presenter:
+    """Collects dirty rectangles and pushes only those to the display."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.dirty = []
+
+    def mark(self, rect):
+        if rect is not None:
+            self.dirty.append(pygame.Rect(rect))
+
+    def mark_all(self):
+        self.dirty = [self.screen.get_rect()]
+
+    def present(self):
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+
+
+class PanelView:
+    """Redraws the control panel only when what it shows has changed."""
+
+    def __init__(self, screen, font, presenter):
+        self.screen = screen
+        self.font = font
+        self.presenter = presenter
+        self.state = None
+
+    def update(self, vertices, mode, result, current_shape_name, speed_label):
+        state = (len(vertices), mode, result, current_shape_name, speed_label)
+        if state == self.state:
+            return
+        self.state = state
+        draw_panel(self.screen, self.font, vertices, mode, result, current_shape_name, speed_label)
+        self.presenter.mark(PANEL_RECT)
+
+
+# Headless benchmark (python Lab-7.py --benchmark [--json results.json])
+BENCHMARK_SIZES = [(700, 600), (1920, 1080), (3840, 2160)]
+
+
+def scale_polygon(polygon, factor, center):
+    """Scale a polygon about `center`."""
+    cx, cy = center
+    return [(cx + (x - cx) * factor, cy + (y - cy) * factor) for x, y in polygon]
+
+
+def random_polygon(rng, n, width, height):
+    """Random star-shaped polygon with n vertices around the canvas center."""
+    cx, cy = width / 2, height / 2
+    max_r = min(width, height) * 0.45
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(n))
+    return [(cx + max_r * rng.uniform(0.3, 1.0) * math.cos(a),
+             cy + max_r * rng.uniform(0.3, 1.0) * math.sin(a)) for a in angles]
+
+
+def benchmark_shapes(width, height, seed=0):
+    """The polygons benchmarked on one canvas size, keyed by label."""
+    shapes = {}
+    factor = min(width / CANVAS_WIDTH, height / HEIGHT)
+    for name in PREDEFINED_POLYGONS.values():
+        polygon = get_polygon_vertices(name, width, height)
+        shapes[name] = polygon
+        if factor > 1:
+            shapes[f"{name} x{factor:.1f}"] = scale_polygon(polygon, factor, (width // 2, height // 2))
+    rng = random.Random(seed)
+    for n in (16, 256):
+        shapes[f"Random {n}"] = random_polygon(rng, n, width, height)
+    return shapes
+
+
+def _benchmark_cases(polygon, width, height):
+    """Template rasters and step generator factories for each algorithm on one polygon.
+
+    Each factory takes the raster and the FillMask the fill should use.
+    """
+    blank = np.zeros((width, height, 3), dtype=np.uint8)
+    pixels, spans = scanline_fill(blank.copy(), polygon, BLACK)
+    if not spans:
+        return {}
+    sx, sy = find_interior_seeds(polygon, width, height)[0]
+
+    # Interior black, exterior in the color each algorithm stops at
+    flood_template = np.empty_like(blank)
+    flood_template[...] = WHITE
+    scanline_fill(flood_template, polygon, BLACK)
+    boundary_template = np.empty_like(blank)
+    boundary_template[...] = RED
+    scanline_fill(boundary_template, polygon, BLACK)
+
+    return {
+        "scanline": (blank, lambda r, mask: scanline_fill_steps(r, polygon, GREEN)),
+        "flood4": (flood_template, lambda r, mask: flood_fill_steps(r, sx, sy, BLACK, BLUE, WHITE, 4, mask)),
+        "flood8": (flood_template, lambda r, mask: flood_fill_steps(r, sx, sy, BLACK, MAGENTA, WHITE, 8, mask)),
+        "boundary": (boundary_template, lambda r, mask: boundary_fill_steps(r, sx, sy, RED, ORANGE, mask=mask)),
+    }
+
+
+def run_benchmark(sizes=BENCHMARK_SIZES, repeats=5, json_path=None):
+    """Time the pure fill algorithms, with no display and no delays.
+
+    Each case first runs once under tracemalloc with a fresh FillMask, to
+    record the peak memory the algorithm allocates including its mask
+    buffers, and once more to count the pixels. It is then timed `repeats`
+    times on a fresh copy of its template raster; only draining the fill's
+    steps is timed, not the copy or any span bookkeeping.
+    """
+    results = []
+    print(f"{'canvas':>10} {'shape':>16} {'algorithm':>9} {'pixels':>9} "
+          f"{'median ms':>10} {'Mpx/s':>8} {'peak KiB':>9}")
+
+    for width, height in sizes:
+        for label, polygon in benchmark_shapes(width, height).items():
+            for algorithm, (template, steps) in _benchmark_cases(polygon, width, height).items():
+                mask = FillMask()
+                raster = template.copy()
+                tracemalloc.start()
+                for _ in steps(raster, mask):
+                    pass
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                pixels, _ = run_fill(steps(template.copy(), mask))
+                times_ns = []
+                for _ in range(repeats):
+                    raster = template.copy()
+                    fill = steps(raster, mask)
+                    start = time.perf_counter_ns()
+                    for _ in fill:
+                        pass
+                    times_ns.append(time.perf_counter_ns() - start)
+
+                median_ns = statistics.median(times_ns)
+                record = {
+                    "canvas": [width, height],
+                    "shape": label,
+                    "vertices": len(polygon),
+                    "algorithm": algorithm,
+                    "pixels": int(pixels),
+                    "repeats": repeats,
+                    "times_ns": times_ns,
+                    "min_ns": min(times_ns),
+                    "median_ns": median_ns,
+                    "mean_ns": statistics.mean(times_ns),
+                    "pixels_per_sec": pixels / (median_ns / 1e9) if median_ns else 0.0,
+                    "peak_bytes": peak,
+                }
+                results.append(record)
+                print(f"{width}x{height:<5} {label:>16} {algorithm:>9} {pixels:>9,} "
+                      f"{median_ns / 1e6:>10.3f} {record['pixels_per_sec'] / 1e6:>8.1f} "
+                      f"{peak / 1024:>9.1f}")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+        print(f"Results written to {json_path}")
+    return results
+
+
 def main():
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Professional Polygon Fill Algorithms Visualizer")
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, 20)
+    animator = FillAnimator(screen, clock)
+    presenter = Presenter(screen)
+    panel = PanelView(screen, font, presenter)
     
     current_polygon_vertices = []
     current_shape_name = None
@@ -384,32 +1588,48 @@ def main():
     result = None
     running = True
     
+    def refresh():
+        # Push panel changes and dirty areas to the display, nothing more
+        panel.update(current_polygon_vertices, mode, result, current_shape_name,
+                     animator.speed_label())
+        presenter.present()
+
     # Initial clear and noise
-    canvas_surface = pygame.Surface((CANVAS_WIDTH, HEIGHT))
-    canvas_surface.fill(BLACK)
-    generate_noise_background(canvas_surface, density=0.005)
-    screen.blit(canvas_surface, (0, 0))
+    clear_canvas(screen)
+    presenter.mark_all()
     
     while running:
-        for event in pygame.event.get():
+        # When idle, block until the next event instead of polling, so an
+        # untouched window costs no CPU
+        events = pygame.event.get() or [pygame.event.wait()]
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                presenter.mark_all()
+            
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_c:
                     # Clear everything
-                    canvas_surface.fill(BLACK)
-                    generate_noise_background(canvas_surface, density=0.005)
-                    screen.blit(canvas_surface, (0, 0))
+                    clear_canvas(screen)
+                    presenter.mark(CANVAS_RECT)
                     current_polygon_vertices = []
                     current_shape_name = None
                     mode = "Select a shape (T, S, A, H)"
                     result = None
                 
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    animator.faster()
+                
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    animator.slower()
+                
                 elif event.key == pygame.K_t:
                     current_shape_name = PREDEFINED_POLYGONS['T']
                     current_polygon_vertices = get_polygon_vertices(current_shape_name, CANVAS_WIDTH, HEIGHT)
                     reset_canvas_with_shape(screen, current_polygon_vertices, WHITE)
+                    presenter.mark(CANVAS_RECT)
                     mode = f"Shape: {current_shape_name} - Ready"
                     result = None
                 
@@ -417,6 +1637,7 @@ def main():
                     current_shape_name = PREDEFINED_POLYGONS['S']
                     current_polygon_vertices = get_polygon_vertices(current_shape_name, CANVAS_WIDTH, HEIGHT)
                     reset_canvas_with_shape(screen, current_polygon_vertices, WHITE)
+                    presenter.mark(CANVAS_RECT)
                     mode = f"Shape: {current_shape_name} - Ready"
                     result = None
 
@@ -424,6 +1645,7 @@ def main():
                     current_shape_name = PREDEFINED_POLYGONS['A']
                     current_polygon_vertices = get_polygon_vertices(current_shape_name, CANVAS_WIDTH, HEIGHT)
                     reset_canvas_with_shape(screen, current_polygon_vertices, WHITE)
+                    presenter.mark(CANVAS_RECT)
                     mode = f"Shape: {current_shape_name} - Ready"
                     result = None
 
@@ -431,21 +1653,46 @@ def main():
                     current_shape_name = PREDEFINED_POLYGONS['H']
                     current_polygon_vertices = get_polygon_vertices(current_shape_name, CANVAS_WIDTH, HEIGHT)
                     reset_canvas_with_shape(screen, current_polygon_vertices, WHITE)
+                    presenter.mark(CANVAS_RECT)
                     mode = f"Shape: {current_shape_name} - Ready"
                     result = None
 
+                elif event.key == pygame.K_m: # Many random polygons in one sweep
+                    clear_canvas(screen)
+                    current_polygon_vertices = []
+                    current_shape_name = None
+                    rng = random.Random()
+                    polygons, colors = [], []
+                    for _ in range(MAP_LAYER_POLYGONS):
+                        polygon = random_polygon(rng, rng.randint(3, 9), 60, 60)
+                        ox, oy = rng.uniform(-30, CANVAS_WIDTH - 30), rng.uniform(-30, HEIGHT - 30)
+                        polygons.append([(x + ox, y + oy) for x, y in polygon])
+                        colors.append((rng.randint(40, 255), rng.randint(40, 255), rng.randint(40, 255)))
+
+                    raster = pygame.surfarray.array3d(screen)[:CANVAS_WIDTH]
+                    start = time.perf_counter()
+                    pixels = batch_scanline_fill(raster, polygons, colors)
+                    duration = time.perf_counter() - start
+                    pygame.surfarray.blit_array(screen.subsurface(CANVAS_RECT), raster)
+                    presenter.mark(CANVAS_RECT)
+                    mode = "Map Layer Complete"
+                    result = (f"Batch Fill ({MAP_LAYER_POLYGONS:,} polygons)", pixels, duration)
+
                 # Algorithm selection
                 if current_polygon_vertices: # Only allow algo selection if a shape is drawn
                     if event.key == pygame.K_1:  # Scanline
                         reset_canvas_with_shape(screen, current_polygon_vertices, WHITE) # Re-draw for clean start
+                        presenter.mark(CANVAS_RECT)
                         mode = "Visualizing Scanline..."
+                        refresh()
                         
-                        start = time.time()
-                        pixels = visualize_scanline(screen, current_polygon_vertices, GREEN, WHITE, speed=5)
-                        duration = time.time() - start
+                        # The algorithm runs on a copy of the canvas; the
+                        # animator presents its steps and times only them.
+                        raster = pygame.surfarray.array3d(screen)[:CANVAS_WIDTH]
+                        steps = scanline_fill_steps(raster, current_polygon_vertices, GREEN)
+                        pixels, duration = animator.run(steps, raster)
                         
-                        draw_polygon(screen, current_polygon_vertices, WHITE) # Ensure border is visible after fill
-                        pygame.display.flip()
+                        presenter.mark(draw_polygon(screen, current_polygon_vertices, WHITE)) # Ensure border is visible after fill
                         
                         mode = "Scanline Complete"
                         result = ("Scanline Fill", pixels, duration)
@@ -455,14 +1702,16 @@ def main():
                         center = get_center(current_polygon_vertices)
                         if center:
                             mode = "Visualizing Flood 4..."
-                            start = time.time()
-                            pixels = visualize_flood_fill_4(screen, center[0], center[1], BLACK, BLUE, WHITE, speed=1)
-                            duration = time.time() - start
-                            draw_polygon(screen, current_polygon_vertices, WHITE)
-                            pygame.display.flip()
+                            presenter.mark(CANVAS_RECT)
+                            refresh()
+                            raster = pygame.surfarray.array3d(screen)[:CANVAS_WIDTH]
+                            steps = flood_fill_steps(raster, center[0], center[1], BLACK, BLUE, WHITE, connectivity=4)
+                            pixels, duration = animator.run(steps, raster)
+                            presenter.mark(draw_polygon(screen, current_polygon_vertices, WHITE))
                             mode = "Flood 4 Complete"
                             result = ("Flood Fill 4-connected", pixels, duration)
                         else:
+                            presenter.mark(CANVAS_RECT)
                             mode = "Error: Cannot find center for Flood Fill."
                     
                     elif event.key == pygame.K_3:  # Flood 8
@@ -470,14 +1719,16 @@ def main():
                         center = get_center(current_polygon_vertices)
                         if center:
                             mode = "Visualizing Flood 8..."
-                            start = time.time()
-                            pixels = visualize_flood_fill_8(screen, center[0], center[1], BLACK, MAGENTA, WHITE, speed=1)
-                            duration = time.time() - start
-                            draw_polygon(screen, current_polygon_vertices, WHITE)
-                            pygame.display.flip()
+                            presenter.mark(CANVAS_RECT)
+                            refresh()
+                            raster = pygame.surfarray.array3d(screen)[:CANVAS_WIDTH]
+                            steps = flood_fill_steps(raster, center[0], center[1], BLACK, MAGENTA, WHITE, connectivity=8)
+                            pixels, duration = animator.run(steps, raster)
+                            presenter.mark(draw_polygon(screen, current_polygon_vertices, WHITE))
                             mode = "Flood 8 Complete"
                             result = ("Flood 8 Complete", pixels, duration)
                         else:
+                            presenter.mark(CANVAS_RECT)
                             mode = "Error: Cannot find center for Flood Fill."
                     
                     elif event.key == pygame.K_4:  # Boundary
@@ -486,19 +1737,44 @@ def main():
                         center = get_center(current_polygon_vertices)
                         if center:
                             mode = "Visualizing Boundary Fill..."
-                            start = time.time()
-                            pixels = visualize_boundary_fill(screen, center[0], center[1], RED, ORANGE, speed=1)
-                            duration = time.time() - start
-                            draw_polygon(screen, current_polygon_vertices, RED) # Ensure RED border is visible
-                            pygame.display.flip()
+                            presenter.mark(CANVAS_RECT)
+                            refresh()
+                            raster = pygame.surfarray.array3d(screen)[:CANVAS_WIDTH]
+                            steps = boundary_fill_steps(raster, center[0], center[1], RED, ORANGE)
+                            pixels, duration = animator.run(steps, raster)
+                            presenter.mark(draw_polygon(screen, current_polygon_vertices, RED)) # Ensure RED border is visible
                             mode = "Boundary Fill Complete"
                             result = ("Boundary Fill", pixels, duration)
                         else:
+                            presenter.mark(CANVAS_RECT)
                             mode = "Error: Cannot find center for Boundary Fill."
 
-        # Draw panel
-        draw_panel(screen, font, current_polygon_vertices, mode, result, current_shape_name)
-        pygame.display.flip()
+                    elif event.key == pygame.K_5:  # Anti-aliased scanline
+                        clear_canvas(screen)
+                        raster = pygame.surfarray.array3d(screen)[:CANVAS_WIDTH]
+                        start = time.perf_counter()
+                        pixels = antialiased_fill(raster, current_polygon_vertices, GREEN)
+                        duration = time.perf_counter() - start
+                        # Shown without the aliased outline so the soft edges are visible
+                        pygame.surfarray.blit_array(screen.subsurface(CANVAS_RECT), raster)
+                        presenter.mark(CANVAS_RECT)
+                        mode = "Anti-aliased Fill Complete"
+                        result = ("Anti-aliased Fill", pixels, duration)
+
+                    elif event.key == pygame.K_6:  # Every enclosed region via labels
+                        reset_canvas_with_shape(screen, current_polygon_vertices, WHITE)
+                        raster = pygame.surfarray.array3d(screen)[:CANVAS_WIDTH]
+                        start = time.perf_counter()
+                        regions = RegionLabels(raster)
+                        pixels = regions.fill_enclosed(raster, CYAN, BLACK)
+                        duration = time.perf_counter() - start
+                        pygame.surfarray.blit_array(screen.subsurface(CANVAS_RECT), raster)
+                        presenter.mark(CANVAS_RECT)
+                        mode = "Enclosed Fill Complete"
+                        result = (f"Label Fill ({len(regions.enclosed(BLACK))} enclosed)", pixels, duration)
+
+        # Redraw the panel if it changed and update only the dirty areas
+        refresh()
         clock.tick(60)
     
     pygame.quit()
@@ -506,4 +1782,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--benchmark" in sys.argv:
+        json_path = sys.argv[sys.argv.index("--json") + 1] if "--json" in sys.argv else None
+        run_benchmark(json_path=json_path)
+    else:
+        main()
\ No newline at end of file
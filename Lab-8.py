@@ -1,7 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from dataclasses import dataclass
-from typing import List, Tuple
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 import math
 
 @dataclass
@@ -55,6 +57,7 @@ class Vec3:
 class Ray:
     origin: Vec3
     direction: Vec3
+    time: float = 0.0
 
 @dataclass
 class Material:
@@ -67,6 +70,86 @@ class Sphere:
     center: Vec3
     radius: float
     material: Material
+    velocity: Vec3 = field(default_factory=lambda: Vec3(0, 0, 0))
+
+    def center_at(self, time: float) -> Vec3:
+        # Linear motion over the shutter interval, used for motion blur
+        if time == 0.0:
+            return self.center
+        return self.center + self.velocity * time
+
+@dataclass
+class Camera:
+    position: Vec3
+    direction: Vec3
+    world_up: Vec3 = field(default_factory=lambda: Vec3(0, 1, 0))
+    fov: float = 75
+    aperture: float = 0.0
+    focus_dist: float = 1.0
+    shutter_open: float = 0.0
+    shutter_close: float = 0.0
+
+    def prepare(self, width: int, height: int):
+        """Cache the camera basis and lens parameters for one frame."""
+        forward = self.direction.normalize()
+        right = forward.cross(self.world_up).normalize()
+        up = right.cross(forward).normalize()
+
+        tan_half = math.tan(math.radians(self.fov / 2))
+        aspect = width / height
+
+        self.width = width
+        self.height = height
+        self.origin = self.position.to_array()
+        self.forward = forward.to_array()
+        self.right = right.to_array()
+        self.up = up.to_array()
+        # Image plane extents at the focus distance, so a thin lens only has
+        # to offset the ray origin and re-aim at the same focal point.
+        self.horizontal = self.right * (aspect * tan_half * self.focus_dist)
+        self.vertical = self.up * (tan_half * self.focus_dist)
+        self.focal_center = self.forward * self.focus_dist
+        self.lens_radius = self.aperture / 2
+
+    def generate_rays(self, rng=np.random):
+        """Generate one jittered primary ray per pixel as (H, W, 3) arrays."""
+        h, w = self.height, self.width
+        px = np.broadcast_to(np.arange(w)[None, :], (h, w))
+        py = np.broadcast_to(np.arange(h)[:, None], (h, w))
+        return self._rays(px, py, rng)
+
+    def generate_ray_chunk(self, start: int, count: int, rng=np.random):
+        """Primary rays for `count` pixels from flat (row-major) index `start`."""
+        py, px = np.divmod(np.arange(start, start + count), self.width)
+        return self._rays(px, py, rng)
+
+    def _rays(self, px, py, rng):
+        # One jittered ray through each pixel (px, py); arrays of any shape
+        shape = px.shape
+        u = (px + rng.random(shape)) / self.width
+        v = (py + rng.random(shape)) / self.height
+        ndc_x = (u * 2 - 1)[..., None]
+        ndc_y = (v * 2 - 1)[..., None]
+
+        focal = self.focal_center + ndc_x * self.horizontal + ndc_y * self.vertical
+        origins = np.broadcast_to(self.origin, shape + (3,))
+
+        if self.lens_radius > 0:
+            # Uniform sample on the lens disk
+            r = self.lens_radius * np.sqrt(rng.random(shape))[..., None]
+            theta = 2 * math.pi * rng.random(shape)[..., None]
+            offset = self.right * (r * np.cos(theta)) + self.up * (r * np.sin(theta))
+            origins = origins + offset
+            focal = focal - offset
+
+        directions = focal / np.linalg.norm(focal, axis=-1, keepdims=True)
+
+        if self.shutter_close > self.shutter_open:
+            times = self.shutter_open + (self.shutter_close - self.shutter_open) * rng.random(shape)
+        else:
+            times = np.full(shape, self.shutter_open)
+
+        return origins, directions, times
 
 @dataclass
 class HitInfo:
@@ -85,6 +168,15 @@ class RayTracer:
         self.image = np.zeros((height, width, 3))
         self.frame_count = 0
 
+        # Progressive rendering state (see start_progressive)
+        self.progressive_scales = (8, 4, 2, 1)
+        self.level = 0
+        self.accum = None
+        self.sample_count = None
+        self.pass_index = 0
+        self.last_complete = None
+        self.rays_per_second = None
+
         # Scene setup
         self.spheres = [
             Sphere(Vec3(0, 1, 0), 1.0, Material(Vec3(0.8, 0.2, 0.2), 0.0, 0.2)),
@@ -95,15 +187,11 @@ class RayTracer:
         ]
 
         # Camera setup
-        self.camera_pos = Vec3(0, 3, 8)
-        self.camera_dir = Vec3(0, -0.3, -1).normalize()
-        self.camera_up = Vec3(0, 1, 0)
-        self.camera_right = self.camera_dir.cross(self.camera_up).normalize()
-        self.camera_up = self.camera_right.cross(self.camera_dir).normalize()
-        self.fov = 75
+        self.camera = Camera(Vec3(0, 3, 8), Vec3(0, -0.3, -1).normalize(), fov=75)
 
     def ray_sphere_intersect(self, ray: Ray, sphere: Sphere) -> HitInfo:
-        oc = ray.origin - sphere.center
+        center = sphere.center_at(ray.time)
+        oc = ray.origin - center
         a = ray.direction.dot(ray.direction)
         b = 2.0 * oc.dot(ray.direction)
         c = oc.dot(oc) - sphere.radius ** 2
@@ -118,7 +206,7 @@ class RayTracer:
 
         if t > 0.001:
             point = ray.origin + ray.direction * t
-            normal = (point - sphere.center).normalize()
+            normal = (point - center).normalize()
             return HitInfo(True, t, point, normal, sphere.material)
 
         return HitInfo(False, 0, Vec3(0, 0, 0), Vec3(0, 0, 0), None)
@@ -188,7 +276,7 @@ class RayTracer:
             refl_dir = (refl_dir * hit.material.metallic + random_dir * (1 - hit.material.metallic)).normalize()
             refl_dir = (refl_dir + random_dir * hit.material.roughness * 0.3).normalize()
 
-            ray = Ray(hit.point, refl_dir)
+            ray = Ray(hit.point, refl_dir, ray.time)
 
             # Russian roulette
             p = max(throughput.x, max(throughput.y, throughput.z))
@@ -200,45 +288,127 @@ class RayTracer:
 
     def render(self):
         print("Starting ray tracing render...")
-        for y in range(self.height):
-            if y % 50 == 0:
-                print(f"Progress: {y}/{self.height}")
-
-            for x in range(self.width):
-                pixel_color = Vec3(0, 0, 0)
-
-                for _ in range(self.samples_per_pixel):
-                    # Jittered sampling
-                    u = (x + np.random.random()) / self.width
-                    v = (y + np.random.random()) / self.height
-
-                    # Ray generation
-                    aspect = self.width / self.height
-                    ndc_x = (u * 2 - 1) * aspect
-                    ndc_y = v * 2 - 1
-
-                    fov_rad = math.radians(self.fov / 2)
-                    ray_dir = (self.camera_dir +
-                               self.camera_right * (ndc_x * math.tan(fov_rad)) +
-                               self.camera_up * (ndc_y * math.tan(fov_rad))).normalize()
-
-                    ray = Ray(self.camera_pos, ray_dir)
-                    pixel_color = pixel_color + self.path_trace(ray)
-
-                pixel_color = pixel_color / self.samples_per_pixel
-
-                # Tone mapping
-                pixel_color = pixel_color / (pixel_color + Vec3(1, 1, 1))
-                pixel_color = Vec3(
-                    pixel_color.x ** (1/2.2),
-                    pixel_color.y ** (1/2.2),
-                    pixel_color.z ** (1/2.2)
-                )
-
-                self.image[y, x] = np.clip([pixel_color.x, pixel_color.y, pixel_color.z], 0, 1)
-
+        self.camera.prepare(self.width, self.height)
+        accum = np.zeros((self.height, self.width, 3))
+
+        for s in range(self.samples_per_pixel):
+            print(f"Sample pass: {s + 1}/{self.samples_per_pixel}")
+            origins, directions, times = self.camera.generate_rays()
+
+            for y in range(self.height):
+                row_origins = origins[y].tolist()
+                row_directions = directions[y].tolist()
+                row_times = times[y].tolist()
+
+                for x in range(self.width):
+                    ray = Ray(Vec3(*row_origins[x]), Vec3(*row_directions[x]), row_times[x])
+                    color = self.path_trace(ray)
+                    accum[y, x, 0] += color.x
+                    accum[y, x, 1] += color.y
+                    accum[y, x, 2] += color.z
+
+        self.image = self.tone_map(accum / self.samples_per_pixel)
         print("Render complete!")
 
+    @staticmethod
+    def tone_map(color: np.ndarray) -> np.ndarray:
+        # Reinhard tone mapping followed by gamma correction
+        color = color / (color + 1)
+        return np.clip(color ** (1/2.2), 0, 1)
+
+    def start_progressive(self, scales: Tuple[int, ...] = (8, 4, 2, 1)):
+        """Restart accumulation from the coarsest resolution level.
+
+        The last finished image stays on show until the new coarsest pass
+        completes, so a restart never flashes an empty frame.
+        """
+        self.progressive_scales = scales
+        self.level = 0
+        self._begin_level()
+
+    def progressive_scales_for(self, budget: float) -> Tuple[int, ...]:
+        """Power-of-two levels whose coarsest pass fits in `budget` seconds.
+
+        Sized from the measured tracing rate; until there is one, the
+        coarsest level is about one chunk of pixels.
+        """
+        allowed = self.rays_per_second * budget if self.rays_per_second else 64
+        scale = 1
+        while scale < max(self.width, self.height) and (self.width // scale) * (self.height // scale) > allowed:
+            scale *= 2
+        return tuple(scale >> i for i in range(scale.bit_length()))
+
+    def _begin_level(self):
+        scale = self.progressive_scales[self.level]
+        pw = max(1, self.width // scale)
+        ph = max(1, self.height // scale)
+        self.camera.prepare(pw, ph)
+        self.accum = np.zeros((ph, pw, 3))
+        self.sample_count = np.zeros((ph, pw), dtype=np.int32)
+        self.frame_count = 0
+        self._begin_pass()
+
+    def _begin_pass(self):
+        # Rays are generated chunk by chunk as the pass is traced, so a new
+        # pass costs nothing up front inside the frame budget
+        self.pass_index = 0
+
+    def render_progressive(self, budget: float, chunk: int = 64) -> int:
+        """Trace primary rays until `budget` seconds have elapsed.
+
+        Work is done in chunks of pixels so a frame never overshoots the
+        budget by more than one chunk. Returns the number of samples traced.
+        """
+        if self.accum is None:
+            self.start_progressive(self.progressive_scales)
+
+        started = time.perf_counter()
+        deadline = started + budget
+        traced = 0
+        ph, pw = self.sample_count.shape
+        flat_accum = self.accum.reshape(-1, 3)
+        flat_count = self.sample_count.reshape(-1)
+
+        while time.perf_counter() < deadline:
+            end = min(self.pass_index + chunk, pw * ph)
+            origins, directions, times = self.camera.generate_ray_chunk(self.pass_index, end - self.pass_index)
+            origins, directions, times = origins.tolist(), directions.tolist(), times.tolist()
+            for k, i in enumerate(range(self.pass_index, end)):
+                color = self.path_trace(Ray(Vec3(*origins[k]), Vec3(*directions[k]), times[k]))
+                flat_accum[i, 0] += color.x
+                flat_accum[i, 1] += color.y
+                flat_accum[i, 2] += color.z
+                flat_count[i] += 1
+            traced += end - self.pass_index
+            self.pass_index = end
+
+            if self.pass_index == pw * ph:
+                self.frame_count += 1
+                self.last_complete = self.progressive_image()
+                if self.level < len(self.progressive_scales) - 1:
+                    self.level += 1
+                    self._begin_level()
+                    ph, pw = self.sample_count.shape
+                    flat_accum = self.accum.reshape(-1, 3)
+                    flat_count = self.sample_count.reshape(-1)
+                else:
+                    self._begin_pass()
+
+        # Smoothed tracing rate, used to size the preview's coarsest level
+        elapsed = time.perf_counter() - started
+        if traced and elapsed > 0:
+            rate = traced / elapsed
+            self.rays_per_second = rate if self.rays_per_second is None else 0.7 * self.rays_per_second + 0.3 * rate
+        return traced
+
+    def progressive_image(self) -> np.ndarray:
+        """Tone-mapped image of the current level, at that level's resolution."""
+        if self.frame_count == 0 and self.last_complete is not None:
+            # Keep showing the coarser level until the first pass lands
+            return self.last_complete
+        count = np.maximum(self.sample_count, 1)[..., None]
+        return self.tone_map(self.accum / count)
+
     def display(self):
         plt.figure(figsize=(12, 8))
         plt.imshow(self.image)
@@ -247,6 +417,90 @@ class RayTracer:
         plt.tight_layout()
         plt.show()
 
+    def preview(self, fps: int = 30, scales: Optional[Tuple[int, ...]] = None):
+        """Interactive pygame preview that refines the image between frames.
+
+        WASD moves the camera, R/F raise and lower it, Q/E turn it. Any
+        camera change restarts accumulation at the coarsest level, which
+        by default is sized so one full pass fits in a frame.
+        """
+        import pygame
+
+        pygame.init()
+        screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption("Ray Tracer Preview")
+        clock = pygame.time.Clock()
+        font = pygame.font.Font(None, 20)
+        frame_time = 1.0 / fps
+        move_speed = 0.15
+        turn_speed = 0.04
+        # A restarted coarsest pass has to land within half a frame
+        restart_budget = frame_time * 0.5
+
+        self.start_progressive(scales or self.progressive_scales_for(restart_budget))
+        running = True
+
+        while running:
+            frame_start = time.perf_counter()
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    running = False
+
+            keys = pygame.key.get_pressed()
+            cam = self.camera
+            forward = Vec3(cam.direction.x, 0, cam.direction.z).normalize()
+            right = forward.cross(cam.world_up).normalize()
+            # Every held key applies, so diagonal moves and turning while
+            # moving work; opposite keys cancel out
+            step = Vec3(0, 0, 0)
+            if keys[pygame.K_w]:
+                step = step + forward
+            if keys[pygame.K_s]:
+                step = step - forward
+            if keys[pygame.K_d]:
+                step = step + right
+            if keys[pygame.K_a]:
+                step = step - right
+            if keys[pygame.K_r]:
+                step = step + cam.world_up
+            if keys[pygame.K_f]:
+                step = step - cam.world_up
+            turn = (keys[pygame.K_q] - keys[pygame.K_e]) * turn_speed
+
+            moving = step.length() > 0
+            if moving:
+                cam.position = cam.position + step * move_speed
+            if turn:
+                c, s = math.cos(turn), math.sin(turn)
+                d = cam.direction
+                cam.direction = Vec3(d.x * c + d.z * s, d.y, -d.x * s + d.z * c)
+
+            if moving or turn:
+                self.start_progressive(scales or self.progressive_scales_for(restart_budget))
+
+            # Spend whatever is left of the frame (minus a margin for the
+            # blit and flip) on tracing more samples.
+            elapsed = time.perf_counter() - frame_start
+            self.render_progressive(max(0.002, frame_time * 0.8 - elapsed))
+
+            image = (self.progressive_image() * 255).astype(np.uint8)
+            surface = pygame.surfarray.make_surface(image.swapaxes(0, 1))
+            if surface.get_size() != (self.width, self.height):
+                surface = pygame.transform.scale(surface, (self.width, self.height))
+            screen.blit(surface, (0, 0))
+
+            scale = self.progressive_scales[self.level]
+            status = f"1/{scale} res  |  {self.frame_count} spp  |  {clock.get_fps():.0f} fps"
+            screen.blit(font.render(status, True, (255, 255, 0)), (10, 10))
+            pygame.display.flip()
+            clock.tick(fps)
+
+        self.image = self.progressive_image()
+        pygame.quit()
+
     def save(self, filename: str = 'ray_traced_image.png'):
         plt.figure(figsize=(12, 8))
         plt.imshow(self.image)
@@ -259,6 +513,11 @@ if __name__ == '__main__':
     # Create ray tracer (smaller resolution for faster render)
     tracer = RayTracer(width=800, height=600, samples_per_pixel=8, max_bounces=5)
 
+    if '--preview' in sys.argv:
+        # Interactive progressive preview instead of a one-shot render
+        tracer.preview()
+        sys.exit()
+
     # Render the scene
     tracer.render()
 
@@ -1,7 +1,10 @@
 import pygame
 import math
+import os
+import re
+import sys
+from collections import OrderedDict
 import numpy as np
-from pygame import gfxdraw
 
 # Initialize Pygame
 pygame.init()
@@ -28,11 +31,9 @@ class Vector3D:
         return Vector3D(0, 0, 0)
 
 class Matrix4x4:
-    def __init__(self):
-        self.m = [[0 for _ in range(4)] for _ in range(4)]
-        # Initialize as identity matrix
-        for i in range(4):
-            self.m[i][i] = 1.0
+    def __init__(self, m=None):
+        # Row-major 4x4 float array; identity unless given
+        self.m = np.identity(4) if m is None else np.asarray(m, dtype=np.float64)
     
     @staticmethod
     def translation(tx, ty, tz):
@@ -84,13 +85,25 @@ class Matrix4x4:
         return matrix
     
     def multiply(self, other):
-        result = Matrix4x4()
-        for i in range(4):
-            for j in range(4):
-                result.m[i][j] = 0
-                for k in range(4):
-                    result.m[i][j] += self.m[i][k] * other.m[k][j]
-        return result
+        return Matrix4x4(self.m @ other.m)
+    
+    def transform_points(self, points):
+        """Transform an (N, 3) or homogeneous (N, 4) array of points at once.
+
+        Returns an (N, 3) array, perspective-divided wherever |w| is large
+        enough, like transform_point.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if points.shape[1] == 3:
+            result = points @ self.m[:3, :3].T + self.m[:3, 3]
+            w = points @ self.m[3, :3] + self.m[3, 3]
+        else:
+            homogeneous = points @ self.m.T
+            result, w = homogeneous[:, :3], homogeneous[:, 3]
+        divide = np.abs(w) > 0.0001
+        if not divide.all():
+            w = np.where(divide, w, 1.0)
+        return result / w[:, None]
     
     def transform_point(self, point):
         x = point.x * self.m[0][0] + point.y * self.m[0][1] + point.z * self.m[0][2] + self.m[0][3]
@@ -102,6 +115,49 @@ class Matrix4x4:
             return Vector3D(x/w, y/w, z/w)
         return Vector3D(x, y, z)
 
+class Transform:
+    """Scale, rotation and translation of an object with a cached matrix.
+
+    Changing any parameter marks the transform dirty; `matrix` composes
+    Scale -> Rotate -> Translate again only after such a change and
+    otherwise returns the same Matrix4x4 object. `on_change`, if set, is
+    called after each change.
+    """
+    PARAMETERS = ("rotation_x", "rotation_y", "rotation_z",
+                  "translation_x", "translation_y", "translation_z",
+                  "scale_x", "scale_y", "scale_z")
+    
+    def __init__(self, rotation=(0, 0, 0), translation=(0, 0, 0), scale=(1, 1, 1)):
+        object.__setattr__(self, "_matrix", None)
+        object.__setattr__(self, "on_change", None)
+        self.rotation_x, self.rotation_y, self.rotation_z = rotation
+        self.translation_x, self.translation_y, self.translation_z = translation
+        self.scale_x, self.scale_y, self.scale_z = scale
+    
+    def __setattr__(self, name, value):
+        changed = name in self.PARAMETERS and getattr(self, name, None) != value
+        if changed:
+            object.__setattr__(self, "_matrix", None)
+        object.__setattr__(self, name, value)
+        if changed and self.on_change is not None:
+            self.on_change()
+    
+    def reset(self):
+        self.rotation_x = self.rotation_y = self.rotation_z = 0
+        self.translation_x = self.translation_y = self.translation_z = 0
+        self.scale_x = self.scale_y = self.scale_z = 1
+    
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            translation = Matrix4x4.translation(self.translation_x, self.translation_y, self.translation_z)
+            rotation_x = Matrix4x4.rotation_x(self.rotation_x)
+            rotation_y = Matrix4x4.rotation_y(self.rotation_y)
+            rotation_z = Matrix4x4.rotation_z(self.rotation_z)
+            scaling = Matrix4x4.scaling(self.scale_x, self.scale_y, self.scale_z)
+            object.__setattr__(self, "_matrix", Matrix4x4(translation.m @ rotation_z.m @ rotation_y.m @ rotation_x.m @ scaling.m))
+        return self._matrix
+
 class LineDrawing:
     @staticmethod
     def bresenham_line(x1, y1, x2, y2):
@@ -130,22 +186,440 @@ class LineDrawing:
                 y += y_inc
         
         return points
+    
+    @staticmethod
+    def bresenham_lines(starts, ends, width, height):
+        """Pixels of many lines at once, clipped to a width x height viewport.
+
+        Takes (E, 2) integer start and end points and returns the x and y
+        coordinates of every on-screen pixel as two int arrays. Each line
+        gets exactly the pixels bresenham_line() gives it: step i along the
+        major axis moves the minor axis by i * minor / major rounded half
+        down. Lines are clipped before any pixels are generated, so long
+        off-screen lines cost nothing.
+        """
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+        delta = ends - starts
+        major = np.abs(delta).max(axis=1)
+        
+        # Liang-Barsky on the parameter t = i / major against the viewport
+        # grown by one pixel; the margin absorbs the minor axis rounding and
+        # the few pixels it lets through are masked below
+        t0 = np.zeros(len(starts))
+        t1 = np.ones(len(starts))
+        keep = np.ones(len(starts), dtype=bool)
+        for axis, size in ((0, width), (1, height)):
+            d = delta[:, axis].astype(np.float64)
+            low = -1.0 - starts[:, axis]
+            high = size - starts[:, axis]
+            moving = d != 0
+            keep &= moving | ((low <= 0) & (high >= 0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                enter = np.where(d > 0, low, high) / d
+                leave = np.where(d > 0, high, low) / d
+            t0 = np.where(moving, np.maximum(t0, enter), t0)
+            t1 = np.where(moving, np.minimum(t1, leave), t1)
+        first = np.floor(t0 * major).astype(np.int64)
+        last = np.ceil(t1 * major).astype(np.int64)
+        keep &= first <= last
+        
+        starts, delta, major = starts[keep], delta[keep], major[keep]
+        first, counts = first[keep], (last - first + 1)[keep]
+        line = np.repeat(np.arange(len(counts)), counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first[line]
+        
+        x_major = np.abs(delta[:, 0]) >= np.abs(delta[:, 1])
+        minor = np.where(x_major, np.abs(delta[:, 1]), np.abs(delta[:, 0]))
+        a = np.maximum(major, 1)[line]
+        offset = (2 * step * minor[line] + a - 1) // (2 * a)
+        x_major = x_major[line]
+        sign = np.sign(delta)[line]
+        xs = starts[line, 0] + sign[:, 0] * np.where(x_major, step, offset)
+        ys = starts[line, 1] + sign[:, 1] * np.where(x_major, offset, step)
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        return xs[inside], ys[inside]
+
+def fan_triangulate(indices, counts):
+    """Fan-triangulate polygons given as flat vertex indices and per-face counts.
+
+    Returns ((T, 3) vertex indices, (T,) index of the face each came from).
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    fans = np.maximum(counts - 2, 0)
+    owners = np.repeat(np.arange(len(counts)), fans)
+    first = np.repeat(starts, fans)
+    k = np.arange(fans.sum()) - np.repeat(np.cumsum(fans) - fans, fans) + 1
+    corners = np.stack([indices[first], indices[first + k], indices[first + k + 1]], axis=1)
+    return corners.reshape(-1, 3), owners
+
+
+def unique_edges(indices, counts):
+    """Undirected edges around every polygon, each listed once, as an (E, 2) array"""
+    indices = np.asarray(indices, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    if not len(indices):
+        return np.zeros((0, 2), dtype=np.int64)
+    counts = counts[counts > 0]
+    starts = np.cumsum(counts) - counts
+    following = np.arange(1, len(indices) + 1)
+    following[starts + counts - 1] = starts  # The last corner closes the loop
+    a, b = indices, indices[following]
+    stride = int(indices.max()) + 1
+    keys = np.sort(np.minimum(a, b) * stride + np.maximum(a, b))
+    # Sort and drop repeats by hand; np.unique is several times slower here
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return np.stack([keys // stride, keys % stride], axis=1)
+
+
+def _parse_numbers(text, dtype, count):
+    # All numbers in whitespace-separated text at NumPy speed, or None
+    # unless exactly `count` of them parse
+    try:
+        values = np.fromstring(text, dtype=dtype, sep=" ")
+    except ValueError:
+        return None
+    return values if len(values) == count else None
+
+
+def load_obj(path):
+    """Read vertices and polygon faces from a Wavefront OBJ file.
+
+    Lines are sorted in one streaming pass and each kind is parsed in bulk,
+    so the file is never held as per-vertex objects; lines the bulk parse
+    cannot handle (extra vertex values, stray tokens) are read one by one.
+    Comments, texture and normal references are ignored. Returns ((N, 3)
+    vertices, flat 0-based vertex indices, (F,) corner count per face).
+    """
+    vertex_lines, face_lines, face_base = [], [], []
+    with open(path, encoding="utf-8", errors="replace") as file:
+        for line in file:
+            words = line.split("#", 1)[0].split(None, 1)
+            if len(words) < 2:
+                continue
+            if words[0] == "v":
+                vertex_lines.append(words[1])
+            elif words[0] == "f":
+                face_lines.append(words[1])
+                face_base.append(len(vertex_lines))
+    
+    vertices = _parse_numbers(" ".join(vertex_lines), np.float64, 3 * len(vertex_lines))
+    if vertices is None:  # Some lines carry w or vertex colors
+        rows = [line.split()[:3] for line in vertex_lines]
+        if any(len(row) < 3 for row in rows):
+            raise ValueError("vertex line with fewer than 3 coordinates")
+        vertices = np.array(rows, dtype=np.float64)
+    vertices = vertices.reshape(-1, 3)
+    
+    counts = np.array([len(line.split()) for line in face_lines], dtype=np.int64)
+    values = _parse_numbers(re.sub(r"/\S*", "", " ".join(face_lines)), np.int64, counts.sum())
+    if values is None:
+        values = np.array([int(word.split("/")[0]) for line in face_lines for word in line.split()],
+                          dtype=np.int64)
+    # Negative indices count back from the vertices read so far
+    bases = np.repeat(np.array(face_base, dtype=np.int64), counts)
+    indices = np.where(values < 0, bases + values, values - 1)
+    return vertices, indices, counts
+
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+
+def _read_ply_header(file):
+    # Returns (format, [(name, count, [(property, type) or (property, count_type, item_type)])])
+    if file.readline().strip() != b"ply":
+        raise ValueError("not a PLY file")
+    fmt, elements = None, []
+    while True:
+        line = file.readline()
+        if not line:
+            raise ValueError("PLY header has no end_header")
+        words = line.decode("ascii", "replace").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            return fmt, elements
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property":
+            if words[1] == "list":
+                elements[-1][2].append((words[4], PLY_TYPES[words[2]], PLY_TYPES[words[3]]))
+            else:
+                elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+
+
+def _uniform_dtype(properties, sizes, byte_order):
+    # Structured dtype for rows whose lists all have the given sizes
+    fields = []
+    for prop in properties:
+        if len(prop) == 2:
+            fields.append((prop[0], byte_order + prop[1]))
+        else:
+            fields.append((prop[0] + "_count", byte_order + prop[1]))
+            fields.append((prop[0], byte_order + prop[2], (sizes[prop[0]],)))
+    return np.dtype(fields)
+
+
+def _read_binary_element(file, count, properties, byte_order):
+    # Returns {property: column}; list columns are (count, size) arrays or lists of arrays
+    lists = [prop for prop in properties if len(prop) == 3]
+    if not lists:
+        dtype = _uniform_dtype(properties, {}, byte_order)
+        rows = np.frombuffer(file.read(dtype.itemsize * count), dtype=dtype, count=count)
+        return {prop[0]: rows[prop[0]] for prop in properties}
+    
+    # Meshes usually have one list length throughout (all triangles, all
+    # quads): guess it from the first row and read everything in one go
+    start = file.tell()
+    sizes, offset = {}, 0
+    for prop in properties:
+        if len(prop) == 3:
+            file.seek(start + offset)
+            sizes[prop[0]] = int(np.frombuffer(file.read(np.dtype(prop[1]).itemsize),
+                                               dtype=byte_order + prop[1])[0])
+        offset += _uniform_dtype([prop], sizes, byte_order).itemsize
+    dtype = _uniform_dtype(properties, sizes, byte_order)
+    file.seek(start)
+    data = file.read(dtype.itemsize * count)
+    if len(data) == dtype.itemsize * count:
+        rows = np.frombuffer(data, dtype=dtype, count=count)
+        if all((rows[name + "_count"] == size).all() for name, size in sizes.items()):
+            return {prop[0]: rows[prop[0]] for prop in properties}
+    
+    # Mixed list lengths: stream row by row
+    file.seek(start)
+    rows = {prop[0]: [] for prop in properties}
+    for _ in range(count):
+        for prop in properties:
+            if len(prop) == 2:
+                item = np.dtype(byte_order + prop[1])
+                rows[prop[0]].append(np.frombuffer(file.read(item.itemsize), dtype=item)[0])
+            else:
+                head = np.dtype(byte_order + prop[1])
+                size = int(np.frombuffer(file.read(head.itemsize), dtype=head)[0])
+                item = np.dtype(byte_order + prop[2])
+                rows[prop[0]].append(np.frombuffer(file.read(item.itemsize * size), dtype=item))
+    return rows
+
+
+def _read_ascii_element(values, position, count, properties):
+    # Same as the binary reader, reading from the file's numbers as one flat array;
+    # also returns the position after the element
+    lists = [prop for prop in properties if len(prop) == 3]
+    if not lists:
+        width = len(properties)
+        block = values[position:position + width * count].reshape(count, width)
+        return {prop[0]: block[:, i] for i, prop in enumerate(properties)}, position + width * count
+    
+    # Same trick as binary: assume every row is shaped like the first one
+    sizes, width = {}, 0
+    for prop in properties:
+        if len(prop) == 3:
+            sizes[prop[0]] = int(values[position + width])
+            width += 1 + sizes[prop[0]]
+        else:
+            width += 1
+    block = values[position:position + width * count]
+    if len(block) == width * count:
+        block = block.reshape(count, width)
+        rows, column, uniform = {}, 0, True
+        for prop in properties:
+            if len(prop) == 2:
+                rows[prop[0]] = block[:, column]
+                column += 1
+            else:
+                uniform &= bool((block[:, column] == sizes[prop[0]]).all())
+                rows[prop[0]] = block[:, column + 1:column + 1 + sizes[prop[0]]]
+                column += 1 + sizes[prop[0]]
+        if uniform:
+            return rows, position + width * count
+    
+    rows = {prop[0]: [] for prop in properties}
+    for _ in range(count):
+        for prop in properties:
+            if len(prop) == 2:
+                rows[prop[0]].append(values[position])
+                position += 1
+            else:
+                size = int(values[position])
+                rows[prop[0]].append(values[position + 1:position + 1 + size])
+                position += 1 + size
+    return rows, position
+
+
+def load_ply(path):
+    """Read vertices and polygon faces from an ASCII or binary PLY file.
+
+    Binary elements are read straight into structured arrays, and rows of
+    equal length are parsed in bulk in both encodings; only meshes that mix
+    face sizes fall back to reading face by face. Returns ((N, 3) vertices,
+    flat 0-based vertex indices, (F,) corner count per face).
+    """
+    with open(path, "rb") as file:
+        fmt, elements = _read_ply_header(file)
+        if fmt == "ascii":
+            values = np.fromstring(file.read().decode("ascii", "replace"), sep=" ")
+            position = 0
+        elif fmt in ("binary_little_endian", "binary_big_endian"):
+            byte_order = "<" if fmt == "binary_little_endian" else ">"
+        else:
+            raise ValueError(f"unsupported PLY format {fmt!r}")
+        
+        data = {}
+        for name, count, properties in elements:
+            if fmt == "ascii":
+                data[name], position = _read_ascii_element(values, position, count, properties)
+            else:
+                data[name] = _read_binary_element(file, count, properties, byte_order)
+    
+    vertex = data["vertex"]
+    vertices = np.stack([np.asarray(vertex[axis], dtype=np.float64) for axis in "xyz"], axis=1)
+    face = data.get("face")
+    if face is None:
+        return vertices, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    key = "vertex_indices" if "vertex_indices" in face else "vertex_index"
+    polygons = face[key]
+    if isinstance(polygons, np.ndarray) and polygons.ndim == 2:
+        counts = np.full(len(polygons), polygons.shape[1], dtype=np.int64)
+        indices = polygons.astype(np.int64).reshape(-1)
+    else:
+        counts = np.array([len(polygon) for polygon in polygons], dtype=np.int64)
+        indices = np.concatenate(polygons).astype(np.int64) if len(polygons) else np.zeros(0, dtype=np.int64)
+    return vertices, indices, counts
+
 
 class Object3D:
     def __init__(self):
-        self.vertices = []
+        self._vertices = []
         self.edges = []
-        self.faces = []
+        self._faces = []
+        self._vertex_array = None
+        self._face_indices = None  # Flat indices and counts of imported faces
+        self._face_counts = None
+        self._triangles = None
+    
+    @classmethod
+    def from_arrays(cls, vertices, indices, counts):
+        """Mesh from (N, 3) vertices and polygons as flat indices plus corner counts.
+
+        Edges for wireframe mode are derived from the faces.
+        """
+        vertices = np.asarray(vertices, dtype=np.float64)
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(vertices)):
+            raise ValueError("face refers to a vertex that does not exist")
+        obj = cls()
+        obj._vertices = None
+        obj._vertex_array = np.ones((len(vertices), 4))
+        obj._vertex_array[:, :3] = vertices
+        obj._faces = None
+        obj._face_indices = indices
+        obj._face_counts = np.asarray(counts, dtype=np.int64)
+        obj.edges = unique_edges(indices, obj._face_counts)
+        return obj
+    
+    @classmethod
+    def load(cls, path):
+        """Load a mesh from an OBJ or PLY (ASCII or binary) file"""
+        loader = load_ply if path.lower().endswith(".ply") else load_obj
+        return cls.from_arrays(*loader(path))
+    
+    def fit(self, size=2):
+        """Center the mesh on the origin and scale its largest side to `size`"""
+        points = self.vertex_array[:, :3]
+        if not len(points):
+            return
+        low, high = points.min(axis=0), points.max(axis=0)
+        extent = (high - low).max()
+        vertex_array = self.vertex_array.copy()
+        vertex_array[:, :3] = (points - (low + high) / 2) * (size / extent if extent > 0 else 1)
+        self._vertex_array = vertex_array
+        self._vertices = None
+    
+    @property
+    def vertices(self):
+        """Vertices as Vector3D objects; built on demand for imported meshes"""
+        if self._vertices is None:
+            self._vertices = [Vector3D(x, y, z) for x, y, z in self._vertex_array[:, :3].tolist()]
+        return self._vertices
+    
+    @vertices.setter
+    def vertices(self, vertices):
+        self._vertices = vertices
+        self._vertex_array = None
+    
+    @property
+    def faces(self):
+        """Faces as lists of vertex indices; built on demand for imported meshes"""
+        if self._faces is None:
+            splits = np.cumsum(self._face_counts)[:-1]
+            self._faces = [face.tolist() for face in np.split(self._face_indices, splits)]
+            self._face_indices = self._face_counts = None  # The list is edited from now on
+        return self._faces
+    
+    @faces.setter
+    def faces(self, faces):
+        self._faces = faces
+        self._face_indices = self._face_counts = None
+        self._triangles = None
+    
+    @property
+    def vertex_array(self):
+        """Vertices as a contiguous (N, 4) homogeneous float array, built once"""
+        if self._vertex_array is None:
+            array = np.ones((len(self._vertices), 4))
+            array[:, :3] = [(v.x, v.y, v.z) for v in self._vertices]
+            self._vertex_array = array
+        return self._vertex_array
+    
+    @property
+    def bounding_sphere(self):
+        """(center, radius) enclosing all vertices, in model space"""
+        vertex_array = self.vertex_array
+        if getattr(self, "_sphere_source", None) is not vertex_array:
+            points = vertex_array[:, :3]
+            if len(points):
+                center = (points.min(axis=0) + points.max(axis=0)) / 2
+                radius = float(np.sqrt(((points - center) ** 2).sum(axis=1).max()))
+            else:
+                center, radius = np.zeros(3), 0.0
+            self._sphere_source, self._sphere = vertex_array, (center, radius)
+        return self._sphere
+    
+    @property
+    def triangles(self):
+        """Faces fan-triangulated, as ((T, 3) vertex indices, (T,) face index)"""
+        if self._triangles is None:
+            if self._face_indices is not None:
+                self._triangles = fan_triangulate(self._face_indices, self._face_counts)
+            else:
+                counts = [len(face) for face in self._faces]
+                indices = [i for face in self._faces for i in face]
+                self._triangles = fan_triangulate(indices, counts)
+        return self._triangles
     
     def add_vertex(self, x, y, z):
         self.vertices.append(Vector3D(x, y, z))
+        self._vertex_array = None
         return len(self.vertices) - 1
     
     def add_edge(self, v1_idx, v2_idx):
+        if isinstance(self.edges, np.ndarray):
+            self.edges = [tuple(edge) for edge in self.edges.tolist()]
         self.edges.append((v1_idx, v2_idx))
     
     def add_face(self, vertex_indices):
         self.faces.append(vertex_indices)
+        self._triangles = None
     
     def create_cube(self, size=1):
         """Create a cube centered at origin"""
@@ -165,14 +639,14 @@ class Object3D:
             (0, 4), (1, 5), (2, 6), (3, 7)   # Connecting edges
         ]
         
-        # Define faces
+        # Define faces, counter-clockwise seen from outside for back-face culling
         self.faces = [
-            [0, 1, 2, 3],  # Front
-            [4, 7, 6, 5],  # Back
+            [0, 3, 2, 1],  # Front
+            [4, 5, 6, 7],  # Back
             [0, 4, 7, 3],  # Left
-            [1, 5, 6, 2],  # Right
+            [1, 2, 6, 5],  # Right
             [0, 1, 5, 4],  # Bottom
-            [3, 2, 6, 7]   # Top
+            [3, 7, 6, 2]   # Top
         ]
     
     def create_pyramid(self, base_size=1, height=1):
@@ -194,15 +668,237 @@ class Object3D:
             (0, 4), (1, 4), (2, 4), (3, 4)   # Apex edges
         ]
         
-        # Define faces
+        # Define faces, counter-clockwise seen from outside for back-face culling
         self.faces = [
-            [0, 3, 2, 1],  # Base
-            [0, 1, 4],     # Face 1
-            [1, 2, 4],     # Face 2
-            [2, 3, 4],     # Face 3
-            [3, 0, 4]      # Face 4
+            [0, 1, 2, 3],  # Base
+            [0, 4, 1],     # Face 1
+            [1, 4, 2],     # Face 2
+            [2, 4, 3],     # Face 3
+            [3, 4, 0]      # Face 4
         ]
 
+class InstanceSet:
+    """Many copies of one Object3D mesh, each placed by its own model matrix.
+
+    The matrices live in one stacked (K, 4, 4) array so all instances are
+    transformed by a single batched multiply. Assign `matrices` or call
+    add() to change them; editing the array in place is not noticed by the
+    renderer's cache.
+    """
+    
+    def __init__(self, mesh, matrices=None):
+        self.mesh = mesh
+        self._buffer = np.zeros((0, 4, 4))
+        self.matrices = np.zeros((0, 4, 4)) if matrices is None else matrices
+    
+    def __len__(self):
+        return len(self._matrices)
+    
+    @property
+    def matrices(self):
+        return self._matrices
+    
+    @matrices.setter
+    def matrices(self, matrices):
+        self._buffer = np.array(matrices, dtype=np.float64).reshape(-1, 4, 4)
+        self._matrices = self._buffer
+        self._spheres = None
+    
+    def add(self, matrix):
+        """Append one instance; takes a Matrix4x4, a Transform or a 4x4 array"""
+        if isinstance(matrix, Transform):
+            matrix = matrix.matrix
+        if isinstance(matrix, Matrix4x4):
+            matrix = matrix.m
+        count = len(self._matrices)
+        if count == len(self._buffer):  # Grow by doubling so adding K instances is O(K)
+            buffer = np.zeros((max(16, 2 * count), 4, 4))
+            buffer[:count] = self._matrices
+            self._buffer = buffer
+        self._buffer[count] = matrix
+        self._matrices = self._buffer[:count + 1]
+        self._spheres = None
+        return count
+    
+    def bounding_spheres(self):
+        """((K, 3) centers, (K,) radii) of the mesh's bounding sphere per instance"""
+        sphere = self.mesh.bounding_sphere
+        if self._spheres is None or self._spheres[0] is not sphere:
+            center, radius = sphere
+            matrices = self._matrices
+            centers = matrices[:, :3, :3] @ center + matrices[:, :3, 3]
+            radii = radius * max_stretch(matrices[:, :3, :3])
+            self._spheres = (sphere, centers, radii)
+        return self._spheres[1:]
+
+class Scene:
+    """Instances of shared meshes, grouped into one InstanceSet per mesh"""
+    
+    def __init__(self):
+        self.instance_sets = []
+    
+    def __len__(self):
+        return sum(len(instances) for instances in self.instance_sets)
+    
+    def add(self, mesh, matrix):
+        for instances in self.instance_sets:
+            if instances.mesh is mesh:
+                return instances.add(matrix)
+        self.instance_sets.append(InstanceSet(mesh))
+        return self.instance_sets[-1].add(matrix)
+
+def max_stretch(linear):
+    """Spectral norm of (..., 3, 3) linear parts: the most they lengthen any vector.
+
+    Bounding radii are scaled by this, which stays conservative under
+    non-uniform scale combined with rotation, where column norms do not.
+    """
+    # Square root of the largest eigenvalue of M^T M; eigvalsh beats an SVD here
+    gram = np.swapaxes(linear, -1, -2) @ linear
+    return np.sqrt(np.maximum(np.linalg.eigvalsh(gram)[..., -1], 0))
+
+def enclosing_sphere(spheres):
+    """(center, radius) of a sphere around a list of (center, radius) spheres.
+
+    Centered on the box around them, so not the tightest fit but cheap;
+    radius is -1 for an empty list. Works on plain tuples, which beats
+    NumPy for the handful of spheres a scene node merges.
+    """
+    if not spheres:
+        return (0.0, 0.0, 0.0), -1.0
+    if len(spheres) == 1:
+        return spheres[0]
+    center = tuple((min(c[i] - r for c, r in spheres) + max(c[i] + r for c, r in spheres)) / 2 for i in range(3))
+    return center, max(math.dist(c, center) + r for c, r in spheres)
+
+class SceneNode:
+    """Node of a scene graph: a local Transform, an optional mesh and children.
+
+    World matrices and world-space bounding spheres are cached. Changing a
+    node's transform marks its own and its descendants' world matrices
+    stale and the bounds of its ancestors, so the next query only redoes
+    the branch that moved. Deep chains are walked without recursion.
+    """
+    
+    def __init__(self, mesh=None, transform=None, name=None):
+        self.mesh = mesh
+        self.name = name
+        self.parent = None
+        self.children = []
+        self._world = None   # World Matrix4x4, None when stale
+        self._bounds = None  # (mesh sphere, subtree sphere) in world space, None when stale
+        self._transform = None
+        self.transform = transform if transform is not None else Transform()
+    
+    @property
+    def transform(self):
+        return self._transform
+    
+    @transform.setter
+    def transform(self, transform):
+        if self._transform is not None:
+            self._transform.on_change = None
+        transform.on_change = self.invalidate
+        self._transform = transform
+        self.invalidate()
+    
+    def add(self, child):
+        """Attach a node (moving it from any previous parent); returns it"""
+        if child.parent is not None:
+            child.parent.remove(child)
+        child.parent = self
+        self.children.append(child)
+        child.invalidate()
+        self._invalidate_bounds()
+        return child
+    
+    def remove(self, child):
+        self.children.remove(child)
+        child.parent = None
+        child.invalidate()
+        self._invalidate_bounds()
+    
+    def invalidate(self):
+        """Mark this subtree's world matrices and bounds, and the bounds above it, stale"""
+        # A stale world matrix means a stale subtree and stale bounds up to
+        # the root, so the walk stops wherever it meets one
+        if self._world is None:
+            return
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node._world = node._bounds = None
+            stack.extend(child for child in node.children if child._world is not None)
+        if self.parent is not None:
+            self.parent._invalidate_bounds()
+    
+    def _invalidate_bounds(self):
+        node = self
+        while node is not None and node._bounds is not None:
+            node._bounds = None
+            node = node.parent
+    
+    @property
+    def world_matrix(self):
+        """Parent's world matrix times the local transform"""
+        if self._world is None:
+            chain, node = [], self
+            while node is not None and node._world is None:
+                chain.append(node)
+                node = node.parent
+            for node in reversed(chain):
+                local = node.transform.matrix
+                node._world = local if node.parent is None else node.parent._world.multiply(local)
+        return self._world
+    
+    @property
+    def bounds(self):
+        """World-space (center, radius) around every mesh in the subtree; radius -1 if none"""
+        self._update_bounds()
+        return self._bounds[1]
+    
+    @property
+    def mesh_bounds(self):
+        """World-space (center, radius) around this node's own mesh; radius -1 if none"""
+        self._update_bounds()
+        return self._bounds[0]
+    
+    def _update_bounds(self):
+        if self._bounds is not None:
+            return
+        # Children before parents, over the stale part of the subtree only
+        order, stack = [], [self]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(child for child in node.children if child._bounds is None)
+        
+        # Own spheres of all stale nodes are transformed in one batch
+        meshed = [node for node in order if node.mesh is not None]
+        own = {}
+        if meshed:
+            worlds = np.array([node.world_matrix.m for node in meshed])
+            centers = np.array([node.mesh.bounding_sphere[0] for node in meshed])
+            radii = np.array([node.mesh.bounding_sphere[1] for node in meshed])
+            centers = np.einsum("kij,kj->ki", worlds[:, :3, :3], centers) + worlds[:, :3, 3]
+            radii = radii * max_stretch(worlds[:, :3, :3])
+            own = dict(zip(meshed, zip(map(tuple, centers.tolist()), radii.tolist())))
+        
+        empty = ((0.0, 0.0, 0.0), -1.0)
+        for node in reversed(order):
+            spheres = [child._bounds[1] for child in node.children if child._bounds[1][1] >= 0]
+            if node in own:
+                spheres.append(own[node])
+            node._bounds = (own.get(node, empty), enclosing_sphere(spheres))
+    
+    def walk(self):
+        """Every node of the subtree, parents before children"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
 class Camera:
     def __init__(self, position, target, up):
         self.position = position
@@ -212,6 +908,288 @@ class Camera:
         self.near = 0.1
         self.far = 100.0
         self.aspect_ratio = 16/9
+        self.ortho_height = 8.0  # World units spanned vertically in orthographic mode
+    
+    def view_matrix(self):
+        """Look-at matrix into camera space: x right, y up, z forward"""
+        eye = np.array([self.position.x, self.position.y, self.position.z], dtype=np.float64)
+        target = np.array([self.target.x, self.target.y, self.target.z], dtype=np.float64)
+        up = np.array([self.up.x, self.up.y, self.up.z], dtype=np.float64)
+        forward = target - eye
+        forward /= np.linalg.norm(forward)
+        right = np.cross(up, forward)
+        right /= np.linalg.norm(right)
+        view = np.identity(4)
+        view[0, :3] = right
+        view[1, :3] = np.cross(forward, right)
+        view[2, :3] = forward
+        view[:3, 3] = -view[:3, :3] @ eye
+        return Matrix4x4(view)
+    
+    def perspective_matrix(self):
+        """Perspective projection to clip space; w is the view depth"""
+        f = 1 / math.tan(self.fov / 2)
+        near, far = self.near, self.far
+        projection = np.zeros((4, 4))
+        projection[0, 0] = f / self.aspect_ratio
+        projection[1, 1] = f
+        projection[2, 2] = (far + near) / (far - near)
+        projection[2, 3] = -2 * far * near / (far - near)
+        projection[3, 2] = 1
+        return Matrix4x4(projection)
+    
+    def orthographic_matrix(self):
+        """Orthographic projection to clip space, `ortho_height` units tall"""
+        half_height = self.ortho_height / 2
+        near, far = self.near, self.far
+        projection = np.identity(4)
+        projection[0, 0] = 1 / (half_height * self.aspect_ratio)
+        projection[1, 1] = 1 / half_height
+        projection[2, 2] = 2 / (far - near)
+        projection[2, 3] = -(far + near) / (far - near)
+        return Matrix4x4(projection)
+    
+    def projection_matrix(self, mode="perspective"):
+        return self.orthographic_matrix() if mode == "orthographic" else self.perspective_matrix()
+
+FACE_COLORS = np.array([
+    (100, 150, 255),  # Light blue
+    (255, 150, 100),  # Light orange
+    (150, 255, 100),  # Light green
+    (255, 100, 150),  # Light pink
+    (150, 100, 255),  # Light purple
+    (255, 255, 100)   # Light yellow
+], dtype=np.uint8)
+FACE_ALPHA = 120
+# Triangles whose bounding box fits these tile sides are rasterized in batches
+# of whole tiles; bigger ones column by column, as exact spans
+BATCH_TILE_SIZES = (2, 4)
+# Candidate pixels handled per batch of span triangles, to bound memory
+SPAN_BATCH_PIXELS = 1 << 20
+# Triangles with a bounding box this large are depth-tested one at a time on
+# their own box of the buffers, where the per-call cost is amortized
+DENSE_TRIANGLE_PIXELS = 4096
+# Above this many edges per frame wireframes are rasterized in one batch
+# instead of one anti-aliased pygame line per edge
+WIREFRAME_BATCH_EDGES = 1000
+
+class Rasterizer:
+    """Z-buffered triangle rasterizer on NumPy color and depth buffers.
+
+    Buffers are indexed [x, y] like pygame.surfarray; colors are written as
+    packed opaque pixels straight into an alpha layer that is blitted onto
+    the screen once per frame. Depth values must be larger for nearer points
+    and affine in screen space, like inverse view depth or negated NDC z,
+    so interpolating them linearly across a triangle is perspective-correct.
+    Only the area drawn since the last clear is reset and presented.
+    """
+    
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.layer = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.depth = np.full((width, height), -np.inf, dtype=np.float32)
+        self.dirty = None  # (x0, y0, x1, y1), end exclusive
+    
+    def pack(self, colors):
+        """Pack (N, 3) RGB colors into the layer's pixel format, fully opaque"""
+        colors = np.asarray(colors, dtype=np.uint32)
+        shifts = self.layer.get_shifts()
+        return ((colors[:, 0] << shifts[0]) | (colors[:, 1] << shifts[1]) | (colors[:, 2] << shifts[2])
+                | np.uint32(255 << shifts[3]))
+    
+    def clear(self):
+        if self.dirty is not None:
+            x0, y0, x1, y1 = self.dirty
+            self.depth[x0:x1, y0:y1] = -np.inf
+            self.layer.fill((0, 0, 0, 0), (x0, y0, x1 - x0, y1 - y0))
+            self.dirty = None
+    
+    def draw_triangles(self, points, depth, triangles, colors):
+        """Rasterize triangles given (N, 2) screen points, (N,) depths,
+        (T, 3) vertex indices and (T, 3) RGB colors."""
+        if not len(triangles):
+            return
+        corners = points[triangles]
+        low = np.clip(np.floor(corners.min(axis=1)).astype(np.int64), 0, (self.width, self.height))
+        high = np.clip(np.ceil(corners.max(axis=1)).astype(np.int64) + 1, 0, (self.width, self.height))
+        a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+        area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+        drawn = np.flatnonzero((area != 0) & (high > low).all(axis=1))
+        if not len(drawn):
+            return
+        
+        box = (low[drawn, 0].min(), low[drawn, 1].min(), high[drawn, 0].max(), high[drawn, 1].max())
+        if self.dirty is not None:
+            box = (min(box[0], self.dirty[0]), min(box[1], self.dirty[1]),
+                   max(box[2], self.dirty[2]), max(box[3], self.dirty[3]))
+        self.dirty = tuple(int(v) for v in box)
+        
+        # Barycentric weights and depth are affine in x and y, so every
+        # triangle reduces to planes a*x + b*y + c evaluated at pixel centers
+        planes = self._planes(corners[drawn], depth[triangles[drawn]], area[drawn])
+        low, high, colors = low[drawn], high[drawn], self.pack(colors)[drawn]
+        # Small triangles are rasterized together on the smallest tile that
+        # fits their bounding box; the rest as spans, also in batches
+        extent = high - low
+        tiles = np.asarray(BATCH_TILE_SIZES)
+        tile_x = np.searchsorted(tiles, extent[:, 0])
+        tile_y = np.searchsorted(tiles, extent[:, 1])
+        batched = (tile_x < len(tiles)) & (tile_y < len(tiles))
+        pixels = pygame.surfarray.pixels2d(self.layer)
+        for tx, ty in set(zip(tile_x[batched].tolist(), tile_y[batched].tolist())):
+            batch = np.flatnonzero(batched & (tile_x == tx) & (tile_y == ty))
+            self._fill_batch(pixels, planes[batch], low[batch], high[batch], colors[batch], tiles[tx], tiles[ty])
+        boxes = extent.prod(axis=1)
+        dense = ~batched & (boxes >= DENSE_TRIANGLE_PIXELS)
+        spans = np.flatnonzero(~batched & ~dense)
+        if len(spans):
+            # Batches start every SPAN_BATCH_PIXELS of bounding box area
+            chunk = (np.cumsum(boxes[spans]) - boxes[spans]) // SPAN_BATCH_PIXELS
+            for batch in np.split(spans, np.flatnonzero(np.diff(chunk)) + 1):
+                self._fill_spans(pixels, planes[batch], low[batch], high[batch], colors[batch])
+        dense = np.flatnonzero(dense)
+        if len(dense):
+            self._fill_dense(pixels, planes[dense], low[dense], high[dense], colors[dense])
+        del pixels  # Unlock the layer
+    
+    @staticmethod
+    def _planes(corners, depths, area):
+        # (T, 4, 3) coefficients: rows are the three weights and the depth,
+        # columns the x, y and constant terms
+        planes = np.empty((len(corners), 4, 3))
+        for i in range(3):
+            p, q = corners[:, (i + 1) % 3], corners[:, (i + 2) % 3]
+            dx, dy = q[:, 0] - p[:, 0], q[:, 1] - p[:, 1]
+            planes[:, i, 0] = -dy / area
+            planes[:, i, 1] = dx / area
+            planes[:, i, 2] = (dy * p[:, 0] - dx * p[:, 1]) / area
+        planes[:, 3] = np.einsum("ti,tij->tj", depths, planes[:, :3])
+        # Single precision halves the memory traffic of the per-pixel work
+        return planes.astype(np.float32)
+    
+    @staticmethod
+    def _covers(planes, px, py):
+        # Mask of samples inside their triangle, and their depth; planes
+        # broadcast against the pixel center coordinates
+        inside = None
+        for i in range(3):
+            a, b, c = planes[i]
+            covered = (a * px) + (b * py + c) >= 0
+            inside = covered if inside is None else inside & covered
+        a, b, c = planes[3]
+        return inside, (a * px) + (b * py + c)
+    
+    def _fill_batch(self, pixels, planes, low, high, colors, width, height):
+        xs = low[:, 0, None] + np.arange(width)  # (T, width) pixel columns of each tile
+        ys = low[:, 1, None] + np.arange(height)
+        px = (xs.astype(np.float32) + 0.5)[:, :, None]
+        py = (ys.astype(np.float32) + 0.5)[:, None, :]
+        inside, depth = self._covers([[planes[:, i, k, None, None] for k in range(3)] for i in range(4)], px, py)
+        inside &= (xs < high[:, 0, None])[:, :, None] & (ys < high[:, 1, None])[:, None, :]
+        tri, ix, iy = np.nonzero(inside)
+        self._resolve(pixels, xs[tri, ix], ys[tri, iy], depth[inside], tri, colors)
+    
+    def _column_spans(self, planes, low, high):
+        # Exact covered rows [top, bottom] of every bounding box column, as
+        # (tri, xs, px, top, bottom) with one entry per column
+        columns = high[:, 0] - low[:, 0]
+        tri = np.repeat(np.arange(len(planes)), columns)
+        xs = np.arange(columns.sum()) - np.repeat(np.cumsum(columns) - columns, columns) + low[tri, 0]
+        px = xs.astype(np.float32) + 0.5
+        column_planes = planes[tri]
+        
+        # In a column each edge test (a*x) + (b*y + c) >= 0 is monotone in
+        # y, so it holds on one side of a crossing. Estimate the crossing,
+        # then settle the end pixel next to it with the same float32
+        # arithmetic _covers uses, so no pixel inside needs a test
+        top = low[tri, 1]
+        bottom = high[tri, 1] - 1
+        for i in range(3):
+            a, b, c = column_planes[:, i, 0], column_planes[:, i, 1], column_planes[:, i, 2]
+            t = a * px
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cross = np.clip(-(t.astype(np.float64) + c) / b - 0.5, -2, self.height + 1)
+            # First passing row going down for b > 0, last one for b < 0
+            step = np.where(b > 0, -1, 1)
+            guess = np.where(b > 0, np.ceil(cross), np.floor(cross))
+            guess = np.nan_to_num(guess).astype(np.int64)
+            beyond = guess + step
+            passes_beyond = t + (b * (beyond.astype(np.float32) + 0.5) + c) >= 0
+            passes = t + (b * (guess.astype(np.float32) + 0.5) + c) >= 0
+            end = np.where(passes_beyond, beyond, np.where(passes, guess, guess - step))
+            top = np.where(b > 0, np.maximum(top, end), top)
+            bottom = np.where(b < 0, np.minimum(bottom, end), bottom)
+            bottom = np.where((b == 0) & (t + c < 0), top - 1, bottom)
+        return tri, xs, px, top, bottom
+    
+    def _fill_spans(self, pixels, planes, low, high, colors):
+        # Spans run down the columns of each bounding box, along the
+        # contiguous axis of the [x, y] buffers
+        tri, xs, px, top, bottom = self._column_spans(planes, low, high)
+        counts = np.maximum(bottom - top + 1, 0)
+        
+        # Expand the spans to pixels; depth is one more plane per column
+        starts = np.cumsum(counts) - counts
+        ys = np.arange(counts.sum()) - np.repeat(starts - top, counts)
+        a, b, c = planes[tri, 3, 0], planes[tri, 3, 1], planes[tri, 3, 2]
+        depth = np.repeat(a * px, counts) + (np.repeat(b, counts) * (ys.astype(np.float32) + 0.5) + np.repeat(c, counts))
+        self._resolve(pixels, np.repeat(xs, counts), ys, depth, np.repeat(tri, counts), colors)
+    
+    def _fill_dense(self, pixels, planes, low, high, colors):
+        # One triangle at a time, in order, on the box its spans cover: the
+        # depth test and both writes are plain masked slice operations, so
+        # overlaps resolve by order with no per-pixel scatter
+        tri, xs, px, top, bottom = self._column_spans(planes, low, high)
+        ends = np.cumsum(high[:, 0] - low[:, 0]).tolist()
+        start = 0
+        for k, end in enumerate(ends):
+            column_top, column_bottom = top[start:end], bottom[start:end]
+            y0, y1 = int(column_top.min()), int(column_bottom.max()) + 1
+            if y1 > y0:
+                rows = np.arange(y0, y1)
+                inside = (rows >= column_top[:, None]) & (rows <= column_bottom[:, None])
+                a, b, c = planes[k, 3]
+                depth = (a * px[start:end])[:, None] + (b * (rows.astype(np.float32) + 0.5) + c)
+                x0, x1 = int(xs[start]), int(xs[end - 1]) + 1
+                zbuffer = self.depth[x0:x1, y0:y1]
+                inside &= depth > zbuffer
+                np.copyto(zbuffer, depth, where=inside)
+                pixels[x0:x1, y0:y1][inside] = colors[k]
+            start = end
+    
+    def _resolve(self, pixels, xs, ys, depth, tri, colors):
+        # Depth-test samples, in triangle order, against the z-buffer.
+        # Several triangles may cover one pixel: the nearest wins, the
+        # earliest triangle on ties
+        pixel = xs * self.height + ys
+        zbuffer = self.depth.reshape(-1)
+        front = np.flatnonzero(depth > zbuffer[pixel])
+        if not len(front):
+            return
+        pixel, depth = pixel[front], depth[front]
+        # Nearest depth per pixel: sort (pixel, depth) packed into one key,
+        # with the float bits mapped so they order like the floats
+        bits = depth.view(np.uint32)
+        bits = np.where(bits >> 31, ~bits, bits | np.uint32(1 << 31))
+        key = (pixel.astype(np.uint64) << np.uint64(32)) | bits
+        key.sort()
+        last = np.append(np.flatnonzero(np.diff(key >> np.uint64(32))), len(key) - 1)
+        bits = (key[last] & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        bits = np.where(bits >> 31, bits & np.uint32(0x7FFFFFFF), ~bits)
+        zbuffer[(key[last] >> np.uint64(32)).astype(np.int64)] = bits.view(np.float32)
+        win = front[depth == zbuffer[pixel]]
+        # Written back to front, so the earliest tie is written last and stays
+        pixels[xs[win][::-1], ys[win][::-1]] = colors[tri[win]][::-1]
+    
+    def present(self, surface, alpha=255):
+        """Blend everything drawn since the last clear onto `surface` in one blit."""
+        if self.dirty is None:
+            return
+        x0, y0, x1, y1 = self.dirty
+        # The layer already holds the pixels; its surface alpha scales theirs
+        self.layer.set_alpha(min(alpha, 255))
+        surface.blit(self.layer, (x0, y0), (x0, y0, x1 - x0, y1 - y0))
 
 class Renderer:
     def __init__(self, width, height):
@@ -219,97 +1197,325 @@ class Renderer:
         self.height = height
         self.screen = pygame.display.set_mode((width, height))
         self.projection_mode = "perspective"  # or "orthographic"
+        # Looking down +z at the origin, framed like the original fixed
+        # projection: 200 pixels per unit at the origin, 100 in orthographic
+        self.camera = Camera(Vector3D(0, 0, -5), Vector3D(0, 0, 0), Vector3D(0, 1, 0))
+        self.camera.fov = 2 * math.atan(height / 2 / (5 * 200))
+        self.camera.aspect_ratio = width / height
+        self.camera.ortho_height = height / 100
+        self._view_projection = None
+        # Last prepared result per object or instance set, reused while
+        # object, matrices and mode are unchanged
+        self._projection_cache = {}
+        self.rasterizer = Rasterizer(width, height)
         
-    def orthographic_projection(self, point, scale=100):
-        """Convert 3D point to 2D using orthographic projection"""
-        x = point.x * scale + self.width // 2
-        y = -point.y * scale + self.height // 2  # Flip Y axis
-        return (int(x), int(y))
+    def view_projection(self):
+        """Viewport * projection * view, rebuilt only when the camera or mode changed"""
+        camera = self.camera
+        state = (self.projection_mode, camera.position.x, camera.position.y, camera.position.z,
+                 camera.target.x, camera.target.y, camera.target.z, camera.up.x, camera.up.y, camera.up.z,
+                 camera.fov, camera.near, camera.far, camera.aspect_ratio, camera.ortho_height)
+        if self._view_projection is None or self._view_projection[0] != state:
+            projection = camera.projection_matrix(self.projection_mode).multiply(camera.view_matrix())
+            # Clip space to pixels, flipping y; applied before the divide
+            viewport = np.identity(4)
+            viewport[0, 0] = viewport[0, 3] = self.width / 2
+            viewport[1, 1], viewport[1, 3] = -self.height / 2, self.height / 2
+            self._view_projection = (state, projection, Matrix4x4(viewport).multiply(projection))
+        return self._view_projection[2]
     
-    def perspective_projection(self, point, camera_distance=5, scale=200):
-        """Convert 3D point to 2D using perspective projection"""
-        if point.z + camera_distance <= 0:
-            return None
+    def frustum_planes(self):
+        """World-space planes (a, b, c, d) of the view volume, inside where a*x + b*y + c*z + d >= 0"""
+        self.view_projection()
+        m = self._view_projection[1].m
+        planes = np.array([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+        return planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+    
+    def sphere_visible(self, center, radius):
+        """False if the sphere lies entirely outside one frustum plane"""
+        return bool(self.spheres_visible(np.asarray(center)[None], np.asarray([radius]))[0])
+    
+    def spheres_visible(self, centers, radii):
+        """Mask of (K, 3) centers and (K,) radii with spheres not wholly outside the frustum"""
+        planes = self.frustum_planes()
+        return (centers @ planes[:, :3].T + planes[:, 3] >= -radii[:, None]).all(axis=1)
+    
+    @staticmethod
+    def front_facing(corners):
+        """Mask of (T, 3, 4) clip-space triangles that face the camera.
+
+        The determinant of the corners' (x, y, w) gives the winding of the
+        projected triangle without dividing, so it holds for corners
+        behind the camera too.
+        """
+        return np.linalg.det(corners[:, :, [0, 1, 3]]) > 0
+    
+    @staticmethod
+    def clip_distances(clip):
+        """Signed distances of clip-space points to the near and far planes"""
+        return clip[..., 3] + clip[..., 2], clip[..., 3] - clip[..., 2]
+    
+    def clip_triangles(self, clip, triangles, owners):
+        """Clip triangles against the near and far planes in clip space.
+
+        Triangles wholly between the planes pass untouched, those wholly
+        outside are dropped, and the few that cross are clipped with
+        Sutherland-Hodgman and re-triangulated; their new corners are
+        appended to `clip`. Returns (clip, triangles, owners).
+        """
+        near, far = self.clip_distances(clip[triangles])
+        whole = (near >= 0).all(axis=1) & (far >= 0).all(axis=1)
+        crossing = ~whole & (near >= 0).any(axis=1) & (far >= 0).any(axis=1)
+        if not crossing.any():
+            return clip, triangles[whole], owners[whole]
+        
+        new_points, new_triangles, new_owners = [], [], []
+        next_index = len(clip)
+        for t in np.flatnonzero(crossing).tolist():
+            polygon = list(clip[triangles[t]])
+            for plane in (0, 1):
+                clipped = []
+                for k, p in enumerate(polygon):
+                    q = polygon[k - 1]
+                    dp, dq = self.clip_distances(p)[plane], self.clip_distances(q)[plane]
+                    if dq >= 0:
+                        clipped.append(q)
+                    if (dq >= 0) != (dp >= 0):
+                        clipped.append(q + (p - q) * (dq / (dq - dp)))
+                polygon = clipped
+            if len(polygon) < 3:
+                continue
+            new_points.extend(polygon)
+            for k in range(1, len(polygon) - 1):
+                new_triangles.append((next_index, next_index + k, next_index + k + 1))
+                new_owners.append(owners[t])
+            next_index += len(polygon)
         
-        perspective_scale = camera_distance / (point.z + camera_distance)
-        x = (point.x * perspective_scale * scale) + self.width // 2
-        y = -(point.y * perspective_scale * scale) + self.height // 2  # Flip Y axis
-        return (int(x), int(y))
+        if new_points:
+            clip = np.vstack([clip, new_points])
+        triangles = np.vstack([triangles[whole], np.array(new_triangles, dtype=np.int64).reshape(-1, 3)])
+        owners = np.concatenate([owners[whole], np.array(new_owners, dtype=np.int64)])
+        return clip, triangles, owners
+    
+    def clip_segments(self, starts, ends):
+        """Clip (E, 4) clip-space segments to the near and far planes; returns the kept parts"""
+        t0 = np.zeros(len(starts))
+        t1 = np.ones(len(starts))
+        keep = np.ones(len(starts), dtype=bool)
+        for fa, fb in zip(self.clip_distances(starts), self.clip_distances(ends)):
+            keep &= (fa >= 0) | (fb >= 0)
+            t = np.divide(fa, fa - fb, out=np.zeros_like(fa), where=(fa < 0) != (fb < 0))
+            t0 = np.where(fa < 0, np.maximum(t0, t), t0)
+            t1 = np.where(fb < 0, np.minimum(t1, t), t1)
+        keep &= t0 <= t1
+        direction = ends - starts
+        return (starts + direction * t0[:, None])[keep], (starts + direction * t1[:, None])[keep]
+    
+    @staticmethod
+    def project_points(clip):
+        """Perspective-divide (N, 4) clipped points into (screen, depth).
+
+        `depth` is the negated NDC z, larger for nearer points; it is affine
+        in screen space, so the rasterizer can interpolate it linearly.
+        """
+        w = clip[:, 3]
+        return clip[:, :2] / w[:, None], -clip[:, 2] / w
     
     def project_point(self, point):
-        """Project 3D point to 2D based on current projection mode"""
-        if self.projection_mode == "orthographic":
-            return self.orthographic_projection(point)
-        else:
-            return self.perspective_projection(point)
+        """Project one 3D point to pixel coordinates, or None outside near/far"""
+        clip = np.array([point.x, point.y, point.z, 1.0]) @ self.view_projection().m.T
+        near, far = self.clip_distances(clip)
+        if near < 0 or far < 0:
+            return None
+        screen, _ = self.project_points(clip[None])
+        return tuple(screen[0].astype(np.int64).tolist())
     
     def draw_line_with_algorithm(self, surface, color, start_pos, end_pos):
         """Draw line using Bresenham's algorithm"""
         if start_pos is None or end_pos is None:
             return
+        self.draw_lines(surface, color, [start_pos], [end_pos])
+    
+    @staticmethod
+    def draw_lines(surface, color, starts, ends):
+        """Draw (E, 2) segments with Bresenham's algorithm in one batch.
+
+        The lines are clipped and rasterized to index arrays, then written
+        through a single locked pixel array instead of one set_at per pixel.
+        """
+        xs, ys = LineDrawing.bresenham_lines(starts, ends, *surface.get_size())
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[xs, ys] = surface.map_rgb(color)
+        del pixels  # Unlocks the surface
+    
+    @staticmethod
+    def draw_points(surface, color, points, radius=0):
+        """Draw (N, 2) points as squares of side 2 * radius + 1 in one batch"""
+        width, height = surface.get_size()
+        side = np.arange(-radius, radius + 1)
+        offsets = np.stack(np.meshgrid(side, side, indexing="ij"), axis=-1).reshape(-1, 2)
+        points = (np.asarray(points, dtype=np.int64).reshape(-1, 1, 2) + offsets).reshape(-1, 2)
+        points = points[(points[:, 0] >= 0) & (points[:, 0] < width) & (points[:, 1] >= 0) & (points[:, 1] < height)]
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[points[:, 0], points[:, 1]] = surface.map_rgb(color)
+        del pixels
+    
+    def prepare(self, obj, transform_matrix):
+        """Cull, clip and project an object; cached while nothing changed.
+
+        Model, view, projection and viewport are merged into one matrix, so
+        the vertices go through a single multiply before clipping and the
+        divide. Returns (triangles, edges, dots): triangles as (screen,
+        depth, (T, 3) indices, (T,) face index), edges as two (E, 2) int
+        arrays of endpoints and dots as an (N, 2) int array of vertices.
+        """
+        vertex_array = obj.vertex_array
+        view_projection = self.view_projection()
+        key = (obj, vertex_array, transform_matrix, view_projection)
+        cache = self._projection_cache.get(id(obj))
+        if cache is not None and all(a is b for a, b in zip(cache[0], key)):
+            return cache[1]
+        
+        center, radius = obj.bounding_sphere
+        center = transform_matrix.transform_points(center[None])[0]
+        radius *= max_stretch(transform_matrix.m[:3, :3])
+        mvp = view_projection.multiply(transform_matrix)
+        clip = (vertex_array @ mvp.m.T)[None]
+        if not self.sphere_visible(center, radius):
+            clip = clip[:0]
+        prepared = self._project_copies(obj, clip)
+        # The key holds references, so the identities cannot be reused
+        self._projection_cache[id(obj)] = (key, prepared)
+        return prepared
+    
+    def prepare_instances(self, instances, transform_matrix):
+        """Cull, clip and project every instance of an InstanceSet at once.
+
+        `transform_matrix` places the whole set. Instances whose bounding
+        sphere is outside the frustum are dropped first; the rest are
+        transformed together through stacked MVP matrices. Returns the same
+        triangles, edges and dots as prepare(), plus the number of
+        instances drawn.
+        """
+        mesh = instances.mesh
+        vertex_array = mesh.vertex_array
+        matrices = instances.matrices
+        view_projection = self.view_projection()
+        key = (instances, vertex_array, matrices, transform_matrix, view_projection)
+        cache = self._projection_cache.get(id(instances))
+        if cache is not None and all(a is b for a, b in zip(cache[0], key)):
+            return cache[1]
+        
+        centers, radii = instances.bounding_spheres()
+        centers = transform_matrix.transform_points(centers)
+        radii = radii * max_stretch(transform_matrix.m[:3, :3])
+        visible = self.spheres_visible(centers, radii)
+        mvp = view_projection.m @ transform_matrix.m @ matrices[visible]
+        clip = vertex_array @ mvp.transpose(0, 2, 1)
+        prepared = self._project_copies(mesh, clip) + (int(visible.sum()),)
+        self._projection_cache[id(instances)] = (key, prepared)
+        return prepared
+    
+    def prepare_graph(self, root):
+        """Cull and project the meshes of a scene graph.
+
+        A subtree whose bounding sphere is outside the frustum is skipped
+        without visiting its nodes. The surviving nodes are grouped by
+        mesh and each group is projected through stacked MVP matrices.
+        Returns (prepared per mesh, number of nodes drawn).
+        """
+        planes = self.frustum_planes().tolist()
+        
+        def visible(sphere):
+            # One sphere at a time is quicker in plain Python than in NumPy
+            (x, y, z), radius = sphere
+            return radius >= 0 and all(a * x + b * y + c * z + d >= -radius for a, b, c, d in planes)
+        
+        matrices = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if not visible(node.bounds):
+                continue
+            if node.mesh is not None and visible(node.mesh_bounds):
+                matrices.setdefault(node.mesh, []).append(node.world_matrix.m)
+            stack.extend(node.children)
+        
+        view_projection = self.view_projection().m
+        prepared = []
+        for mesh, stacked in matrices.items():
+            mvp = view_projection @ np.array(stacked)
+            prepared.append(self._project_copies(mesh, mesh.vertex_array @ mvp.transpose(0, 2, 1)))
+        return prepared, sum(len(stacked) for stacked in matrices.values())
+    
+    def _project_copies(self, obj, clip):
+        # Back-face cull, clip and project K copies of a mesh from their
+        # (K, N, 4) clip-space vertices, as one mesh of K * N vertices
+        copies, count = clip.shape[:2]
+        clip = clip.reshape(-1, 4)
+        offsets = np.arange(copies) * count
         
-        points = LineDrawing.bresenham_line(start_pos[0], start_pos[1], end_pos[0], end_pos[1])
-        for point in points:
-            if 0 <= point[0] < self.width and 0 <= point[1] < self.height:
-                surface.set_at(point, color)
+        # Back faces are dropped before clipping and any pixel work
+        triangles, owners = obj.triangles
+        triangles = (triangles[None] + offsets[:, None, None]).reshape(-1, 3)
+        owners = np.tile(owners, copies)
+        front = self.front_facing(clip[triangles])
+        clipped, triangles, owners = self.clip_triangles(clip, triangles[front], owners[front])
+        screen, depth = self.project_points(clipped)
+        
+        edges = np.asarray(obj.edges, dtype=np.int64).reshape(-1, 2)
+        edges = (edges[None] + offsets[:, None, None]).reshape(-1, 2)
+        starts, ends = self.clip_segments(clip[edges[:, 0]], clip[edges[:, 1]])
+        start_pixels = self.project_points(starts)[0].astype(np.int64)
+        end_pixels = self.project_points(ends)[0].astype(np.int64)
+        
+        near, far = self.clip_distances(clip)
+        dots = self.project_points(clip[(near >= 0) & (far >= 0)])[0].astype(np.int64)
+        return (screen, depth, triangles, owners), (start_pixels, end_pixels), dots
     
     def render_object(self, obj, transform_matrix, wireframe=True, filled=False):
         """Render 3D object with transformations and enhanced visuals"""
-        # Transform vertices
-        transformed_vertices = []
-        for vertex in obj.vertices:
-            transformed_vertex = transform_matrix.transform_point(vertex)
-            transformed_vertices.append(transformed_vertex)
-        
-        # Project to 2D
-        projected_vertices = []
-        for vertex in transformed_vertices:
-            projected = self.project_point(vertex)
-            projected_vertices.append(projected)
-        
-        # Draw filled faces first (if enabled)
+        # Transform, cull, clip and project in one pass, unless nothing changed
+        self.draw_prepared([self.prepare(obj, transform_matrix)], wireframe, filled)
+    
+    def render_scene(self, scene, transform_matrix, wireframe=True, filled=False):
+        """Render every instance in a Scene; returns how many survived culling"""
+        prepared = [self.prepare_instances(instances, transform_matrix) for instances in scene.instance_sets]
+        self.draw_prepared([item[:3] for item in prepared], wireframe, filled)
+        return sum(item[3] for item in prepared)
+    
+    def render_graph(self, root, wireframe=True, filled=False):
+        """Render a scene graph; returns how many nodes survived culling"""
+        prepared, drawn = self.prepare_graph(root)
+        self.draw_prepared(prepared, wireframe, filled)
+        return drawn
+    
+    def draw_prepared(self, prepared, wireframe=True, filled=False):
+        """Draw the output of prepare() for one or more meshes"""
+        # Draw filled faces first (if enabled), depth-tested across all meshes
         if filled:
-            for i, face in enumerate(obj.faces):
-                face_points = []
-                valid_face = True
-                for vertex_idx in face:
-                    if projected_vertices[vertex_idx] is None:
-                        valid_face = False
-                        break
-                    face_points.append(projected_vertices[vertex_idx])
-                
-                if valid_face and len(face_points) >= 3:
-                    # Different colors for different faces
-                    colors = [
-                        (100, 150, 255, 120),  # Light blue
-                        (255, 150, 100, 120),  # Light orange
-                        (150, 255, 100, 120),  # Light green
-                        (255, 100, 150, 120),  # Light pink
-                        (150, 100, 255, 120),  # Light purple
-                        (255, 255, 100, 120)   # Light yellow
-                    ]
-                    face_color = colors[i % len(colors)]
-                    
-                    try:
-                        # Create surface for face with alpha
-                        face_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-                        pygame.gfxdraw.filled_polygon(face_surface, face_points, face_color)
-                        self.screen.blit(face_surface, (0, 0), special_flags=pygame.BLEND_ALPHA_SDL2)
-                        
-                        # Add face outline
-                        if len(face_points) > 2:
-                            pygame.draw.polygon(self.screen, (255, 255, 255, 80), face_points, 1)
-                    except:
-                        pass  # Skip if polygon is invalid
+            self.rasterizer.clear()
+            for (screen, depth, triangles, owners), _, _ in prepared:
+                # Different colors for different faces, blended like the old alpha faces
+                colors = FACE_COLORS[owners % len(FACE_COLORS)]
+                self.rasterizer.draw_triangles(screen, depth, triangles, colors)
+            self.rasterizer.present(self.screen, FACE_ALPHA)
+        
+        # Big wireframes go through the batched line rasterizer, unblended,
+        # with vertices as small squares
+        if wireframe and sum(len(starts) for _, (starts, _), _ in prepared) > WIREFRAME_BATCH_EDGES:
+            starts = np.concatenate([starts for _, (starts, _), _ in prepared])
+            ends = np.concatenate([ends for _, (_, ends), _ in prepared])
+            dots = np.concatenate([dots for _, _, dots in prepared])
+            self.draw_lines(self.screen, (0, 200, 200), starts, ends)
+            self.draw_points(self.screen, (255, 255, 0), dots, 1)  # Yellow vertices
+            self.draw_points(self.screen, (255, 100, 0), dots)     # Orange center
+            return
         
         # Draw wireframe with enhanced colors
         if wireframe:
-            for edge in obj.edges:
-                v1_idx, v2_idx = edge
-                start_pos = projected_vertices[v1_idx]
-                end_pos = projected_vertices[v2_idx]
-                
-                if start_pos is not None and end_pos is not None:
+            for _, (starts, ends), _ in prepared:
+                for start_pos, end_pos in zip(starts.tolist(), ends.tolist()):
                     # Enhanced wireframe colors
                     edge_color = (0, 255, 255)  # Cyan for better visibility
                     
@@ -322,8 +1528,8 @@ class Renderer:
         
         # Draw vertices as small circles for better visualization
         if wireframe:
-            for projected_vertex in projected_vertices:
-                if projected_vertex is not None:
+            for _, _, dots in prepared:
+                for projected_vertex in dots.tolist():
                     # Draw vertex points
                     pygame.draw.circle(self.screen, (255, 255, 0), projected_vertex, 3)  # Yellow vertices
                     pygame.draw.circle(self.screen, (255, 100, 0), projected_vertex, 2)  # Orange center
@@ -332,8 +1538,31 @@ class Renderer:
         """Toggle between orthographic and perspective projection"""
         self.projection_mode = "orthographic" if self.projection_mode == "perspective" else "perspective"
 
+# Transform readouts and FPS are re-rendered at most this often
+UI_REFRESH_MS = 250
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, color), evicting the least recently used"""
+    
+    def __init__(self, font, capacity=256):
+        self.font = font
+        self.capacity = capacity
+        self._surfaces = OrderedDict()
+    
+    def render(self, text, color):
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.capacity:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
 class Graphics3DApp:
-    def __init__(self):
+    def __init__(self, mesh_paths=()):
         self.width = 1200
         self.height = 800
         self.renderer = Renderer(self.width, self.height)
@@ -349,19 +1578,27 @@ class Graphics3DApp:
         self.pyramid = Object3D()
         self.pyramid.create_pyramid(2, 2)
         
+        # Imported meshes join the cube and pyramid, fitted to the same size
+        self.objects = [("cube", self.cube), ("pyramid", self.pyramid)]
+        for path in mesh_paths:
+            mesh = Object3D.load(path)
+            mesh.fit(2)
+            self.objects.append((os.path.splitext(os.path.basename(path))[0], mesh))
+        
         self.current_object = self.cube
         self.object_type = "cube"
         
-        # Transformation parameters
-        self.rotation_x = 0.3  # Start with slight rotation for better view
-        self.rotation_y = 0.3
-        self.rotation_z = 0
-        self.translation_x = 0
-        self.translation_y = 0
-        self.translation_z = 0
-        self.scale_x = 1
-        self.scale_y = 1
-        self.scale_z = 1
+        # Transformation parameters; start with slight rotation for better view
+        self.transform = Transform(rotation=(0.3, 0.3, 0))
+        
+        # Shown instead of the object with I and G: a field of cube and
+        # pyramid instances, and a scene graph of swaying arms whose root
+        # is moved by the transform controls
+        self.field = self.create_field()
+        self.graph = self.create_graph()
+        self.graph_size = sum(1 for _ in self.graph.walk())
+        self.view = "object"  # or "field" or "graph"
+        self.drawn = 0
         
         # Rendering options
         self.wireframe = True
@@ -371,10 +1608,67 @@ class Graphics3DApp:
         # Clock for frame rate
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 20)  # Slightly smaller for better fit
+        self.text_cache = TextCache(self.font)
+        
+        # UI overlay: static panels composed once, plus a layer holding them
+        # and the live values, rebuilt only when a value changes
+        self.ui_panels = self.create_ui_panels()
+        self.ui_layer = None
+        self.ui_status = None
+        self.ui_values = None
+        self.ui_updated = -UI_REFRESH_MS
+        
+        # Background with the grid drawn in, as (grid offset, surface)
+        self.backdrop = None
         
         # Animation variables for smooth transitions
         self.animation_time = 0
     
+    def create_field(self, rows=100, spacing=1.0, size=0.3):
+        """Scene of rows x rows small cubes and pyramids on a grid below the camera"""
+        count = rows * rows
+        rng = np.random.default_rng(7)
+        grid = (np.arange(rows) - (rows - 1) / 2) * spacing
+        x, z = np.meshgrid(grid, grid, indexing="ij")
+        yaw = rng.uniform(0, 2 * math.pi, count)
+        scale = size * rng.uniform(0.7, 1.3, count)
+        
+        # Scaled yaw rotations, stacked; built directly rather than one Transform each
+        matrices = np.zeros((count, 4, 4))
+        matrices[:, 0, 0] = matrices[:, 2, 2] = np.cos(yaw) * scale
+        matrices[:, 0, 2] = np.sin(yaw) * scale
+        matrices[:, 2, 0] = -matrices[:, 0, 2]
+        matrices[:, 1, 1] = scale
+        matrices[:, 0, 3] = x.ravel()
+        matrices[:, 1, 3] = -3
+        matrices[:, 2, 3] = z.ravel()
+        matrices[:, 3, 3] = 1
+        
+        field = Scene()
+        field.instance_sets = [InstanceSet(self.cube, matrices[0::2]), InstanceSet(self.pyramid, matrices[1::2])]
+        return field
+    
+    def create_graph(self, arms=8, segments=12, leaves=3):
+        """Scene graph of jointed arms around a hub, each joint carrying a cube and pyramids"""
+        root = SceneNode(transform=self.transform, name="root")
+        root.add(SceneNode(self.cube, Transform(scale=(0.3, 0.3, 0.3)), "hub"))
+        self.arm_joints = []
+        for arm in range(arms):
+            joint = root.add(SceneNode(transform=Transform(rotation=(0, 0, 2 * math.pi * arm / arms)), name=f"arm{arm}"))
+            self.arm_joints.append(joint)
+            # Meshes hang off the joints, so their scale does not pass down the chain
+            for segment in range(segments):
+                joint = joint.add(SceneNode(transform=Transform(rotation=(0, 0, 0.12), translation=(0.2, 0, 0))))
+                size = 0.07 * (1 - segment / (segments + 4))
+                joint.add(SceneNode(self.cube, Transform(scale=(size, size, size))))
+                for leaf in range(leaves):
+                    angle = 2 * math.pi * leaf / leaves
+                    joint.add(SceneNode(self.pyramid, Transform(
+                        rotation=(angle, 0, 0),
+                        translation=(0, 1.8 * size * math.cos(angle), 1.8 * size * math.sin(angle)),
+                        scale=(size / 2, size / 2, size / 2))))
+        return root
+    
     def create_gradient_background(self):
         """Create a beautiful gradient background"""
         background = pygame.Surface((self.width, self.height))
@@ -403,134 +1697,138 @@ class Graphics3DApp:
         return background
     
     def get_transform_matrix(self):
-        """Calculate combined transformation matrix"""
-        # Create individual transformation matrices
-        translation = Matrix4x4.translation(self.translation_x, self.translation_y, self.translation_z)
-        rotation_x = Matrix4x4.rotation_x(self.rotation_x)
-        rotation_y = Matrix4x4.rotation_y(self.rotation_y)
-        rotation_z = Matrix4x4.rotation_z(self.rotation_z)
-        scaling = Matrix4x4.scaling(self.scale_x, self.scale_y, self.scale_z)
-        
-        # Combine transformations: Scale -> Rotate -> Translate
-        transform = translation.multiply(rotation_z.multiply(rotation_y.multiply(rotation_x.multiply(scaling))))
-        return transform
+        """Combined transformation matrix, rebuilt only when a parameter changed"""
+        return self.transform.matrix
     
     def handle_input(self):
         """Handle keyboard and mouse input"""
         keys = pygame.key.get_pressed()
+        transform = self.transform
         
         # Rotation controls
         rotation_speed = 0.02
-        if keys[pygame.K_q]: self.rotation_x += rotation_speed
-        if keys[pygame.K_a]: self.rotation_x -= rotation_speed
-        if keys[pygame.K_w]: self.rotation_y += rotation_speed
-        if keys[pygame.K_s]: self.rotation_y -= rotation_speed
-        if keys[pygame.K_e]: self.rotation_z += rotation_speed
-        if keys[pygame.K_d]: self.rotation_z -= rotation_speed
+        if keys[pygame.K_q]: transform.rotation_x += rotation_speed
+        if keys[pygame.K_a]: transform.rotation_x -= rotation_speed
+        if keys[pygame.K_w]: transform.rotation_y += rotation_speed
+        if keys[pygame.K_s]: transform.rotation_y -= rotation_speed
+        if keys[pygame.K_e]: transform.rotation_z += rotation_speed
+        if keys[pygame.K_d]: transform.rotation_z -= rotation_speed
         
         # Translation controls
         translation_speed = 0.1
-        if keys[pygame.K_UP]: self.translation_y += translation_speed
-        if keys[pygame.K_DOWN]: self.translation_y -= translation_speed
-        if keys[pygame.K_LEFT]: self.translation_x -= translation_speed
-        if keys[pygame.K_RIGHT]: self.translation_x += translation_speed
-        if keys[pygame.K_PAGEUP]: self.translation_z += translation_speed
-        if keys[pygame.K_PAGEDOWN]: self.translation_z -= translation_speed
+        if keys[pygame.K_UP]: transform.translation_y += translation_speed
+        if keys[pygame.K_DOWN]: transform.translation_y -= translation_speed
+        if keys[pygame.K_LEFT]: transform.translation_x -= translation_speed
+        if keys[pygame.K_RIGHT]: transform.translation_x += translation_speed
+        if keys[pygame.K_PAGEUP]: transform.translation_z += translation_speed
+        if keys[pygame.K_PAGEDOWN]: transform.translation_z -= translation_speed
         
         # Scaling controls
         scale_speed = 0.01
         if keys[pygame.K_PLUS] or keys[pygame.K_EQUALS]:
-            self.scale_x += scale_speed
-            self.scale_y += scale_speed
-            self.scale_z += scale_speed
+            transform.scale_x += scale_speed
+            transform.scale_y += scale_speed
+            transform.scale_z += scale_speed
         if keys[pygame.K_MINUS]:
-            self.scale_x = max(0.1, self.scale_x - scale_speed)
-            self.scale_y = max(0.1, self.scale_y - scale_speed)
-            self.scale_z = max(0.1, self.scale_z - scale_speed)
+            transform.scale_x = max(0.1, transform.scale_x - scale_speed)
+            transform.scale_y = max(0.1, transform.scale_y - scale_speed)
+            transform.scale_z = max(0.1, transform.scale_z - scale_speed)
     
-    def draw_ui(self):
-        """Draw enhanced user interface with colors and backgrounds"""
-        # Colors
-        bg_color = (20, 20, 40, 180)  # Semi-transparent dark blue
-        title_color = (255, 215, 0)   # Gold
-        status_color = (0, 255, 127)  # Spring green
-        value_color = (255, 182, 193) # Light pink
-        control_color = (173, 216, 230) # Light blue
-        header_color = (255, 69, 0)   # Red orange
-        
-        # Create semi-transparent background panels
-        ui_bg = pygame.Surface((580, 320), pygame.SRCALPHA)
-        ui_bg.fill(bg_color)
-        self.renderer.screen.blit(ui_bg, (5, 5))
-        
-        controls_bg = pygame.Surface((580, 180), pygame.SRCALPHA)
-        controls_bg.fill((40, 20, 40, 180))
-        self.renderer.screen.blit(controls_bg, (5, 335))
+    # UI colors
+    TITLE_COLOR = (255, 215, 0)      # Gold
+    STATUS_COLOR = (0, 255, 127)     # Spring green
+    VALUE_COLOR = (255, 182, 193)    # Light pink
+    CONTROL_COLOR = (173, 216, 230)  # Light blue
+    HEADER_COLOR = (255, 69, 0)      # Red orange
+    
+    def create_ui_panels(self):
+        """Semi-transparent panels with the title, headers and controls, composed once.
+
+        The surface covers both panels and is placed at (5, 5).
+        """
+        panels = pygame.Surface((580, 510), pygame.SRCALPHA)
+        panels.fill((20, 20, 40, 180), (0, 0, 580, 320))    # Semi-transparent dark blue
+        panels.fill((40, 20, 40, 180), (0, 330, 580, 180))
         
         # Title
-        title = self.font.render("🎮 3D GRAPHICS TRANSFORMATIONS", True, title_color)
-        self.renderer.screen.blit(title, (15, 15))
+        panels.blit(self.text_cache.render("🎮 3D GRAPHICS TRANSFORMATIONS", self.TITLE_COLOR), (10, 10))
         
-        # Status information with colors
-        status_texts = [
-            (f"📦 Object: {self.object_type.upper()}", status_color),
-            (f"🎯 Projection: {self.renderer.projection_mode.upper()}", status_color),
-            (f"🔄 Auto-Rotate: {'ON' if self.auto_rotate else 'OFF'}", (0, 255, 0) if self.auto_rotate else (255, 100, 100)),
-            (f"🖼️  Wireframe: {'ON' if self.wireframe else 'OFF'}", (0, 255, 0) if self.wireframe else (255, 100, 100)),
-            (f"🎨 Fill: {'ON' if self.filled else 'OFF'}", (0, 255, 0) if self.filled else (255, 100, 100))
-        ]
-        
-        y_pos = 50
-        for text, color in status_texts:
-            surface = self.font.render(text, True, color)
-            self.renderer.screen.blit(surface, (15, y_pos))
-            y_pos += 30
-        
-        # Transformation values with highlighting
-        transform_header = self.font.render("🔧 TRANSFORMATIONS:", True, header_color)
-        self.renderer.screen.blit(transform_header, (15, y_pos + 10))
-        y_pos += 40
-        
-        transform_texts = [
-            f"🔄 Rotation   → X: {self.rotation_x:.2f}  Y: {self.rotation_y:.2f}  Z: {self.rotation_z:.2f}",
-            f"📍 Translation → X: {self.translation_x:.2f}  Y: {self.translation_y:.2f}  Z: {self.translation_z:.2f}",
-            f"📏 Scale      → X: {self.scale_x:.2f}  Y: {self.scale_y:.2f}  Z: {self.scale_z:.2f}"
-        ]
-        
-        for text in transform_texts:
-            surface = self.font.render(text, True, value_color)
-            self.renderer.screen.blit(surface, (15, y_pos))
-            y_pos += 25
+        # Header of the transformation values, which sit below the 5 status lines
+        panels.blit(self.text_cache.render("🔧 TRANSFORMATIONS:", self.HEADER_COLOR), (10, 45 + 5 * 30 + 10))
         
         # Controls section with better formatting
-        controls_header = self.font.render("🎮 CONTROLS:", True, header_color)
-        self.renderer.screen.blit(controls_header, (15, 345))
-        
+        panels.blit(self.text_cache.render("🎮 CONTROLS:", self.HEADER_COLOR), (10, 340))
         control_texts = [
             "🔄 ROTATION    → Q/A: X-axis  |  W/S: Y-axis  |  E/D: Z-axis",
             "📍 TRANSLATION → ↑↓←→: XY plane  |  PgUp/PgDn: Z-axis",
             "📏 SCALING     → +/-: Uniform scale",
-            "🔀 TOGGLES     → P: Projection  |  O: Object  |  Space: Wireframe",
+            "🔀 TOGGLES     → P: Projection  |  O: Object  |  I: Field  |  G: Graph  |  Space: Wireframe",
             "⚡ SPECIAL     → F: Fill  |  T: Auto-rotate  |  R: Reset  |  ESC: Exit"
         ]
-        
-        y_pos = 375
+        y_pos = 370
         for text in control_texts:
-            surface = self.font.render(text, True, control_color)
-            self.renderer.screen.blit(surface, (15, y_pos))
+            panels.blit(self.text_cache.render(text, self.CONTROL_COLOR), (10, y_pos))
             y_pos += 25
+        return panels.convert_alpha()
+    
+    def draw_ui(self):
+        """Draw enhanced user interface with colors and backgrounds.
+
+        Status lines follow the toggles at once; transform readouts, FPS and
+        the count of drawn instances are refreshed every UI_REFRESH_MS. Text
+        comes from the cache and is composed onto a copy of the static
+        panels only when it changed, so most frames just blit the finished
+        layer.
+        """
+        values = self.ui_values
+        now = pygame.time.get_ticks()
+        if now - self.ui_updated >= UI_REFRESH_MS:
+            self.ui_updated = now
+            transform = self.transform
+            fps = int(self.clock.get_fps())
+            fps_color = (0, 255, 0) if fps >= 50 else (255, 255, 0) if fps >= 30 else (255, 0, 0)
+            values = ((
+                f"🔄 Rotation   → X: {transform.rotation_x:.2f}  Y: {transform.rotation_y:.2f}  Z: {transform.rotation_z:.2f}",
+                f"📍 Translation → X: {transform.translation_x:.2f}  Y: {transform.translation_y:.2f}  Z: {transform.translation_z:.2f}",
+                f"📏 Scale      → X: {transform.scale_x:.2f}  Y: {transform.scale_y:.2f}  Z: {transform.scale_z:.2f}"
+            ), (f"⚡ FPS: {fps}", fps_color), self.drawn)
+        transform_texts, fps_text, drawn = values
         
+        # Status information with colors
+        if self.view == "field":
+            object_text = f"📦 Object: FIELD ({drawn} of {len(self.field)} drawn)"
+        elif self.view == "graph":
+            object_text = f"📦 Object: GRAPH ({drawn} of {self.graph_size} nodes drawn)"
+        else:
+            object_text = f"📦 Object: {self.object_type.upper()}"
+        status = (
+            (object_text, self.STATUS_COLOR),
+            (f"🎯 Projection: {self.renderer.projection_mode.upper()}", self.STATUS_COLOR),
+            (f"🔄 Auto-Rotate: {'ON' if self.auto_rotate else 'OFF'}", (0, 255, 0) if self.auto_rotate else (255, 100, 100)),
+            (f"🖼️  Wireframe: {'ON' if self.wireframe else 'OFF'}", (0, 255, 0) if self.wireframe else (255, 100, 100)),
+            (f"🎨 Fill: {'ON' if self.filled else 'OFF'}", (0, 255, 0) if self.filled else (255, 100, 100))
+        )
+        
+        if self.ui_layer is None or status != self.ui_status or values != self.ui_values:
+            self.ui_status, self.ui_values = status, values
+            layer = self.ui_panels.copy()
+            y_pos = 45
+            for text, color in status:
+                layer.blit(self.text_cache.render(text, color), (10, y_pos))
+                y_pos += 30
+            y_pos += 40
+            for text in transform_texts:
+                layer.blit(self.text_cache.render(text, self.VALUE_COLOR), (10, y_pos))
+                y_pos += 25
+            self.ui_layer = layer
+        
+        self.renderer.screen.blit(self.ui_layer, (5, 5))
         # FPS Counter
-        fps = int(self.clock.get_fps())
-        fps_color = (0, 255, 0) if fps >= 50 else (255, 255, 0) if fps >= 30 else (255, 0, 0)
-        fps_text = self.font.render(f"⚡ FPS: {fps}", True, fps_color)
-        self.renderer.screen.blit(fps_text, (self.width - 100, 15))
+        self.renderer.screen.blit(self.text_cache.render(*fps_text), (self.width - 100, 15))
     
     def reset_transformations(self):
         """Reset all transformations to default values"""
-        self.rotation_x = self.rotation_y = self.rotation_z = 0
-        self.translation_x = self.translation_y = self.translation_z = 0
-        self.scale_x = self.scale_y = self.scale_z = 1
+        self.transform.reset()
     
     def run(self):
         """Main application loop"""
@@ -545,12 +1843,13 @@ class Graphics3DApp:
                     if event.key == pygame.K_p:
                         self.renderer.toggle_projection()
                     elif event.key == pygame.K_o:
-                        if self.object_type == "cube":
-                            self.current_object = self.pyramid
-                            self.object_type = "pyramid"
-                        else:
-                            self.current_object = self.cube
-                            self.object_type = "cube"
+                        names = [name for name, _ in self.objects]
+                        index = (names.index(self.object_type) + 1) % len(self.objects)
+                        self.object_type, self.current_object = self.objects[index]
+                    elif event.key == pygame.K_i:
+                        self.view = "object" if self.view == "field" else "field"
+                    elif event.key == pygame.K_g:
+                        self.view = "object" if self.view == "graph" else "graph"
                     elif event.key == pygame.K_r:
                         self.reset_transformations()
                     elif event.key == pygame.K_f:
@@ -568,20 +1867,26 @@ class Graphics3DApp:
             # Auto-rotation with smooth animation
             if self.auto_rotate:
                 self.animation_time += 0.016  # ~60 FPS timing
-                self.rotation_y += 0.01
-                self.rotation_x += 0.005
+                self.transform.rotation_y += 0.01
+                self.transform.rotation_x += 0.005
                 # Add slight oscillation for more interesting animation
-                self.translation_z = 0.5 * math.sin(self.animation_time * 2)
-            
-            # Clear screen with gradient background
-            self.renderer.screen.blit(self.background, (0, 0))
+                self.transform.translation_z = 0.5 * math.sin(self.animation_time * 2)
             
-            # Add subtle moving grid effect
-            self.draw_grid_effect()
+            # Clear screen with gradient background and subtle moving grid
+            self.renderer.screen.blit(self.get_backdrop(), (0, 0))
             
             # Get transformation matrix and render object
             transform = self.get_transform_matrix()
-            self.renderer.render_object(self.current_object, transform, self.wireframe, self.filled)
+            if self.view == "field":
+                self.drawn = self.renderer.render_scene(self.field, transform, self.wireframe, self.filled)
+            elif self.view == "graph":
+                # Only the swaying arms' branches need new world matrices
+                seconds = pygame.time.get_ticks() / 1000
+                for arm, joint in enumerate(self.arm_joints):
+                    joint.transform.rotation_y = 0.4 * math.sin(seconds * 1.5 + arm)
+                self.drawn = self.renderer.render_graph(self.graph, self.wireframe, self.filled)
+            else:
+                self.renderer.render_object(self.current_object, transform, self.wireframe, self.filled)
             
             # Draw UI
             self.draw_ui()
@@ -595,23 +1900,32 @@ class Graphics3DApp:
         
         pygame.quit()
     
-    def draw_grid_effect(self):
-        """Draw a subtle animated grid effect in the background"""
-        grid_color = (20, 30, 50, 50)  # Very subtle
+    def get_backdrop(self):
+        """Gradient background with the grid drawn in, recomposed only when the grid moved"""
         grid_size = 50
         offset = int((self.animation_time * 10) % grid_size)
+        if self.backdrop is None or self.backdrop[0] != offset:
+            surface = self.background.copy()
+            self.draw_grid_effect(surface, offset, grid_size)
+            self.backdrop = (offset, surface)
+        return self.backdrop[1]
+    
+    def draw_grid_effect(self, surface, offset, grid_size=50):
+        """Draw a subtle grid effect, shifted by offset pixels"""
+        grid_color = (20, 30, 50, 50)  # Very subtle
         
         # Vertical lines
         for x in range(-offset, self.width + grid_size, grid_size):
             if x >= 0 and x < self.width:
-                pygame.draw.line(self.renderer.screen, grid_color, (x, 0), (x, self.height), 1)
+                pygame.draw.line(surface, grid_color, (x, 0), (x, self.height), 1)
         
         # Horizontal lines
         for y in range(-offset, self.height + grid_size, grid_size):
             if y >= 0 and y < self.height:
-                pygame.draw.line(self.renderer.screen, grid_color, (0, y), (self.width, y), 1)
+                pygame.draw.line(surface, grid_color, (0, y), (self.width, y), 1)
 
 # Main execution
 if __name__ == "__main__":
-    app = Graphics3DApp()
+    # Any OBJ/PLY files given on the command line can be cycled to with O
+    app = Graphics3DApp(sys.argv[1:])
     app.run()